@@ -1,25 +1,134 @@
+import io
+import os
+from functools import partial
 import streamlit as st
 import time
-import re
-from openai import OpenAI
+import openai
+
+from utils.answer_cache import get_answer_cache
+from utils.assistant_batch import answer_questions, write_results_csv
+from utils.assistant_runs import RunError, RunSession
+from utils.llm_backend import get_client
+from utils.response_cleaner import ResponseCleaner, clean_response
+from utils.retrieval_index import RETRIEVAL_MODE, format_passages, get_retrieval_index
+
+# Minimum seconds between redraws of a streaming answer.
+STREAM_RENDER_INTERVAL = 0.05
+
+# Example question buttons: (button label, question sent to the assistant).
+# Also the standard FAQs answered by the batch mode.
+EXAMPLE_QUESTIONS = (
+    ("What role does the FSCA play in structured finance?",
+     "What role does the Financial Sector Conduct Authority (FSCA) play in structured finance transactions in South Africa?"),
+    ("What are the typical risk management strategies for currency volatility?",
+     "What are the typical risk management strategies employed by South African banks when dealing "
+     "with currency volatility in cross-border structured finance transactions?"),
+    ("What are the differences between JSE Main Board and AltX listing requirements?",
+     "What are the key differences in regulatory requirements between the JSE's Main Board and the AltX "
+     "for listing structured finance products?"),
+    ("How do SA Banks Act requirements shape SPV establishment?",
+     "How do the South African Banks Act requirements shape the establishment and operation of SPVs used "
+     "in structured finance transactions?"),
+)
+
+# Seconds the assistant's settings are reused before being fetched again.
+ASSISTANT_TTL_SECONDS = int(os.environ.get("DONNA_ASSISTANT_TTL_SECONDS", 600))
+
+# Passages from the local index given to the assistant per question.
+LOCAL_PASSAGES = 5
+
+LOCAL_INSTRUCTIONS = ("Answer using the following passages from the Vault documents where they are relevant, "
+                      "and say so when they do not cover the question.\n\n")
+
+# Seconds between checks of the vector store for changed files (which
+# invalidate the answer cache).
+KNOWLEDGE_CHECK_SECONDS = int(os.environ.get("DONNA_KNOWLEDGE_CHECK_SECONDS", 60))
+
+
+@st.cache_data(ttl=ASSISTANT_TTL_SECONDS, show_spinner=False)
+def get_assistant(_client, assistant_id):
+    """The assistant object, fetched at most once per ASSISTANT_TTL_SECONDS."""
+    return _client.beta.assistants.retrieve(assistant_id)
+
+
+@st.cache_data(ttl=KNOWLEDGE_CHECK_SECONDS, show_spinner=False)
+def get_vector_store_state(_client, vector_store_id):
+    """File counts and size of the vector store; they change when its files do."""
+    store = _client.vector_stores.retrieve(vector_store_id)
+    counts = store.file_counts
+    return (vector_store_id, counts.total, counts.completed, store.usage_bytes)
+
+
+def knowledge_version(client, assistant):
+    """
+    What cached answers depend on: the assistant's model and instructions
+    and the contents of the vector store. None if it cannot be checked, or
+    if answers use a Vault project's documents (local retrieval with a
+    project open), in which case the answer cache is not used. Local mode
+    without a project searches no documents, so nothing else is versioned.
+    """
+    if RETRIEVAL_MODE == "local":
+        if current_vault_project() is not None:
+            # Answers use the open project's documents; not shareable
+            return None
+        store_state = "local"
+    else:
+        try:
+            store_state = get_vector_store_state(client, st.secrets["VECTOR_STORE_ID"])
+        except openai.OpenAIError:
+            return None
+    return (assistant.id, assistant.model, assistant.instructions, store_state)
+
+
+def local_context(question, project):
+    """
+    Instructions with the best passages for a question from one Vault
+    project's documents, or None.
+    """
+    if project is None:
+        return None
+    passages = get_retrieval_index().search(question, k=LOCAL_PASSAGES, project=project)
+    return LOCAL_INSTRUCTIONS + format_passages(passages) if passages else None
+
+
+def current_vault_project():
+    """The Vault project open in this session, or None."""
+    return st.session_state.get("current_vault_project")
+
+
+def run_options(question):
+    """
+    Extra run parameters for a question: in local retrieval mode, no
+    file_search and the local passages as additional instructions.
+    """
+    if RETRIEVAL_MODE != "local":
+        return {}
+    options = {"tools": []}
+    context = local_context(question, current_vault_project())
+    if context:
+        options["additional_instructions"] = context
+    return options
 
 
 def display_assistant():
     # ------------------------------
     # 1. Initialization
     # ------------------------------
-    client = OpenAI(api_key=st.secrets["OPENAI_API_KEY"])
+    client = get_client(st.secrets["OPENAI_API_KEY"])
 
     if "thread_id" not in st.session_state:
-        thread = client.beta.threads.create(
-            tool_resources={"file_search": {"vector_store_ids": [st.secrets["VECTOR_STORE_ID"]]}}
-        )
+        if RETRIEVAL_MODE == "local":
+            thread = client.beta.threads.create()
+        else:
+            thread = client.beta.threads.create(
+                tool_resources={"file_search": {"vector_store_ids": [st.secrets["VECTOR_STORE_ID"]]}}
+            )
         st.session_state.thread_id = thread.id
 
     if "messages" not in st.session_state:
         st.session_state.messages = []
 
-    assistant = client.beta.assistants.retrieve(st.secrets["ASSISTANT_ID"])
+    assistant = get_assistant(client, st.secrets["ASSISTANT_ID"])
 
     # ------------------------------
     # 2. Layout
@@ -63,51 +172,17 @@ def display_assistant():
 
         st.markdown("<div class='example-box'><h3>🔍 Example Questions</h3></div>", unsafe_allow_html=True)
 
-        # Example question 1
-        if st.button("What role does the FSCA play in structured finance?"):
-            question = "What role does the Financial Sector Conduct Authority (FSCA) play in structured finance transactions in South Africa?"
-            # Show user bubble
-            with st.chat_message("user"):
-                st.write(question)
-            st.session_state.messages.append({"role": "user", "content": question})
-
-            run_llm(client, assistant, question)
-            st.rerun()
+        for label, question in EXAMPLE_QUESTIONS:
+            if st.button(label):
+                # Show user bubble
+                with st.chat_message("user"):
+                    st.write(question)
+                st.session_state.messages.append({"role": "user", "content": question})
 
-        # Example question 2
-        if st.button("What are the typical risk management strategies for currency volatility?"):
-            question = ("What are the typical risk management strategies employed by South African banks when dealing "
-                        "with currency volatility in cross-border structured finance transactions?")
-            with st.chat_message("user"):
-                st.write(question)
-            st.session_state.messages.append({"role": "user", "content": question})
+                run_llm(client, assistant, question)
+                st.rerun()
 
-            run_llm(client, assistant, question)
-            st.rerun()
-
-        # Example question 3
-        if st.button("What are the differences between JSE Main Board and AltX listing requirements?"):
-            question = (
-                "What are the key differences in regulatory requirements between the JSE's Main Board and the AltX "
-                "for listing structured finance products?")
-            with st.chat_message("user"):
-                st.write(question)
-            st.session_state.messages.append({"role": "user", "content": question})
-
-            run_llm(client, assistant, question)
-            st.rerun()
-
-        # Example question 4
-        if st.button("How do SA Banks Act requirements shape SPV establishment?"):
-            question = (
-                "How do the South African Banks Act requirements shape the establishment and operation of SPVs used "
-                "in structured finance transactions?")
-            with st.chat_message("user"):
-                st.write(question)
-            st.session_state.messages.append({"role": "user", "content": question})
-
-            run_llm(client, assistant, question)
-            st.rerun()
+        display_batch_questions(assistant)
 
         st.markdown("""
             <div class="instruction-box">
@@ -123,69 +198,129 @@ def display_assistant():
 
 def run_llm(client, assistant, user_prompt):
     """
-    Send the user's question to the LLM, wait for the run to complete,
-    display an assistant bubble with 'Thinking...' then final answer,
-    and store the final answer in st.session_state.messages.
+    Send the user's question to the LLM as a streaming run, render the
+    answer into an assistant bubble as tokens arrive ('Thinking...' until the
+    first one), and store the final answer in st.session_state.messages.
+    The run is driven by RunSession: failed/expired/stuck runs end with a
+    message instead of hanging, within RUN_DEADLINE_SECONDS, and the run is
+    cancelled if this script run is stopped.
+
+    Questions answered before (same or near-identical wording, same
+    knowledge version) are answered from the AnswerCache without a run.
+    Only a conversation's first question is looked up or stored: a
+    follow-up ("explain that second point") depends on this session's
+    earlier turns, so its answer is not anyone else's.
     """
-    # 1) Create a thread message for the user prompt
-    client.beta.threads.messages.create(
-        thread_id=st.session_state.thread_id,
-        role="user",
-        content=user_prompt
-    )
-
-    # 2) Start a run
-    run = client.beta.threads.runs.create(
-        thread_id=st.session_state.thread_id,
-        assistant_id=assistant.id
-    )
-
-    # 3) Create an assistant bubble
+    cache = get_answer_cache()
+    first_turn = len(st.session_state.messages) <= 1
+    version = knowledge_version(client, assistant) if first_turn else None
+    cached = cache.lookup(user_prompt, version) if version is not None else None
+    if cached is not None:
+        with st.chat_message("assistant"):
+            st.markdown(cached["answer"], unsafe_allow_html=True)
+        # The thread has not seen this turn; it is sent with the next run so
+        # follow-up questions keep their context
+        st.session_state.setdefault("unsent_messages", []).extend([
+            {"role": "user", "content": user_prompt},
+            {"role": "assistant", "content": cached["answer"]},
+        ])
+        st.session_state.messages.append({"role": "assistant", "content": cached["answer"]})
+        return
+
     with st.chat_message("assistant"):
         placeholder = st.empty()
         placeholder.write("Thinking...")
 
-        # 4) Wait until run completes
-        while run.status != "completed":
-            time.sleep(0.5)
-            run = client.beta.threads.runs.retrieve(
-                thread_id=st.session_state.thread_id,
-                run_id=run.id
-            )
-
-        # 5) Retrieve the new assistant message
-        messages_resp = client.beta.threads.messages.list(
-            thread_id=st.session_state.thread_id
-        )
-        # Typically the newest message is data[0]. If that merges Q&A, switch to data[-1].
-        raw_assistant_msg = messages_resp.data[0].content[0].text.value
-
-        cleaned_message = clean_response(raw_assistant_msg)
+        last_render = [0.0]
+        cleaner = ResponseCleaner()
+
+        def render(text):
+            # Clean only the new part of the answer; redraw at most every
+            # STREAM_RENDER_INTERVAL seconds
+            cleaned = cleaner.update(text)
+            now = time.monotonic()
+            if now - last_render[0] >= STREAM_RENDER_INTERVAL:
+                placeholder.markdown(cleaned + " ▌", unsafe_allow_html=True)
+                last_render[0] = now
+
+        session = RunSession(client, st.session_state.thread_id, assistant.id,
+                             last_message_id=st.session_state.get("last_message_id"),
+                             run_options=run_options(user_prompt))
+        try:
+            cleaner.update(session.ask(user_prompt, on_text=render,
+                                       context_messages=st.session_state.get("unsent_messages", [])))
+            cleaned_message = cleaner.close()
+            st.session_state.unsent_messages = []
+            if version is not None:
+                cache.store(user_prompt, cleaned_message, version)
+        except RunError as e:
+            cleaned_message = f"Sorry, the assistant could not answer ({e})."
+        except openai.OpenAIError as e:
+            cleaned_message = f"Sorry, the assistant is unavailable right now ({type(e).__name__})."
+        st.session_state.last_message_id = session.last_message_id
         placeholder.markdown(cleaned_message, unsafe_allow_html=True)
 
-    # 6) Append the final answer to the chat history
+    # Append the final answer to the chat history
     st.session_state.messages.append({"role": "assistant", "content": cleaned_message})
 
 
-def clean_response(raw_text: str) -> str:
+def display_batch_questions(assistant):
     """
-    Clean references like [1], bracketed text, etc.
+    Batch mode: answers many questions at once (at most BATCH_CONCURRENCY at
+    a time, each in its own thread), adds them to the chat and offers the
+    answers as a CSV download.
     """
-    text = re.sub(r'\[\d+\]', '', raw_text)
-    text = re.sub(r'\d+:\d+†[^】]*】', '', text)
-    text = re.sub(r'【.*?】', '', text)
-    text = re.sub(r'[【】]', '', text)
-
-    # Break into sentences, do minimal reformat
-    lines = text.split('.')
-    formatted_lines = []
-    for line in lines:
-        if not line.strip():
-            continue
-        if re.match(r'^\s*\d+\s*', line):
-            formatted_lines.append('\n' + line.strip() + '.')
-        else:
-            formatted_lines.append(line.strip() + '.')
-    text = ' '.join(formatted_lines)
-    text = re.sub(r'\n\s*\n', '\n', text)
-    return text.strip()
+    with st.expander("📋 Batch Questions"):
+        text = st.text_area("One question per line", key="batch_questions_text")
+        questions = [line.strip() for line in text.splitlines() if line.strip()]
+        col1, col2 = st.columns(2)
+        with col1:
+            ask_listed = st.button("Answer all", disabled=not questions)
+        with col2:
+            ask_faqs = st.button("Answer standard FAQs")
+        if ask_faqs:
+            questions = [question for _, question in EXAMPLE_QUESTIONS]
+
+        if ask_listed or ask_faqs:
+            progress = st.progress(0.0, text=f"Answering {len(questions)} questions...")
+
+            def on_result(result, n_done):
+                progress.progress(n_done / len(questions), text=f"Answered {n_done} of {len(questions)}")
+
+            try:
+                local = RETRIEVAL_MODE == "local"
+                context_for = partial(local_context, project=current_vault_project()) if local else None
+                results = answer_questions(
+                    st.secrets["OPENAI_API_KEY"], assistant.id, None if local else st.secrets["VECTOR_STORE_ID"],
+                    questions, on_result=on_result, context_for=context_for,
+                )
+            except Exception as e:
+                st.error(f"Error answering the batch: {e}")
+                return
+            cache = get_answer_cache()
+            version = knowledge_version(get_client(st.secrets["OPENAI_API_KEY"]), assistant)
+            for result in results:
+                if result["status"] == "completed":
+                    result["answer"] = clean_response(result["answer"])
+                    if version is not None:
+                        cache.store(result["question"], result["answer"], version)
+                else:
+                    result["answer"] = f"Sorry, the assistant could not answer (run {result['status']})."
+                st.session_state.messages.append({"role": "user", "content": result["question"]})
+                st.session_state.messages.append({"role": "assistant", "content": result["answer"]})
+            st.session_state.batch_results = results
+            st.rerun()
+
+        results = st.session_state.get("batch_results")
+        if results:
+            answered = sum(result["status"] == "completed" for result in results)
+            st.caption(f"Last batch: {answered} of {len(results)} answered. Batch answers are not part of "
+                       "the chat's conversation memory.")
+            csv_text = io.StringIO()
+            write_results_csv(results, csv_text)
+            st.download_button(
+                label="Download Answers CSV",
+                data=csv_text.getvalue().encode('utf-8'),
+                file_name="assistant_batch_answers.csv",
+                mime='text/csv'
+            )
@@ -3,6 +3,8 @@
 import streamlit as st
 import openai
 
+from utils.llm_backend import chat_completion
+
 def setup_openai_api():
     """
     Load your OpenAI API key from st.secrets or an environment variable.
@@ -432,14 +434,10 @@ The materials are designed to [purpose of presentation], with supporting data an
 def call_openai_chat_completion(prompt):
     """
     Example helper if you want to call the OpenAI ChatCompletion API.
-    You can adapt this as needed in your app code.
+    Goes through the configured LLM backend (utils/llm_backend.py), so it
+    also works against the mock server.
     """
     try:
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=1000
-        )
-        return response.choices[0].message.content.strip()
+        return chat_completion(st.secrets.get("OPENAI_API_KEY", ""), prompt, max_tokens=1000).strip()
     except Exception as e:
         return f"Error calling OpenAI: {str(e)}"
@@ -13,6 +13,14 @@ import data_utils
 import openai_utils
 import utils
 
+# Pages of the sidebar menu, in menu order.
+PAGES = {
+    "Introduction": introduction.display_introduction,
+    "Assistant": assistant.display_assistant,
+    "Vault": vault.display_vault,
+    "Workflows": display_workflows,
+}
+
 def main():
     # Basic Streamlit config
     st.set_page_config(
@@ -42,15 +50,19 @@ def main():
     # If using OpenAI:
     openai_utils.setup_openai_api()  # loads st.secrets, etc.
 
+    # A ?page=<name> link opens that page first
+    requested = st.query_params.get("page")
+    default_index = list(PAGES).index(requested) if requested in PAGES else 0
+
     # Sidebar
     with st.sidebar:
         st.markdown('<div class="logo-text">Donna</div>', unsafe_allow_html=True)
         selected = option_menu(
             menu_title=None,
-            options=["Introduction", "Assistant", "Vault", "Workflows"],
+            options=list(PAGES),
             icons=["house", "chat", "folder", "grid"],
             menu_icon=None,
-            default_index=0,
+            default_index=default_index,
             styles={
                 "container": {"padding": "0", "background-color": "transparent"},
                 "icon": {"color": "rgba(255, 255, 255, 0.7)", "font-size": "16px"},
@@ -64,15 +76,9 @@ def main():
             }
         )
 
-    # Routing to each "page"
-    if selected == "Introduction":
-        introduction.display_introduction()
-    elif selected == "Assistant":
-        assistant.display_assistant()
-    elif selected == "Vault":
-        vault.display_vault()
-    elif selected == "Workflows":
-        workflows.workflows_main.display_workflows()
+    # Routing to each "page". The menu component renders nothing when the
+    # app runs headless (AppTest), so fall back to the requested page.
+    PAGES[selected or list(PAGES)[default_index]]()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,48 @@
+"""
+Benchmark of column formatting against formatting cell by cell:
+python tests/benchmark_formatting.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.formatting import format_column  # noqa: E402
+from utils.helpers import format_negatives  # noqa: E402
+
+
+def _best_of(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _compare(label, series):
+    vectorized = _best_of(lambda: format_column(series, decimals=2))
+    per_cell = _best_of(lambda: series.apply(format_negatives))
+    assert format_column(series, decimals=2).tolist() == series.apply(format_negatives).fillna("").tolist()
+    print(f"{label:32s} format_column {vectorized * 1000:8.1f} ms   "
+          f"apply(format_negatives) {per_cell * 1000:8.1f} ms   {per_cell / vectorized:5.1f}x")
+
+
+def main():
+    rng = np.random.default_rng(0)
+    numbers = np.round(rng.normal(0, 1e6, 500_000), 2)
+    _compare("500k floats", pd.Series(numbers, name="Capital ZAR"))
+
+    mixed = pd.Series(numbers[:200_000], dtype=object, name="Capital ZAR")
+    mixed[::10] = "n/a"
+    mixed[5::10] = None
+    _compare("200k mixed cells (20% text/None)", mixed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark of the streamed answer cleaner over the answer corpus:
+python tests/benchmark_response_cleaner.py
+"""
+
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.response_cleaner import ResponseCleaner, clean_response  # noqa: E402
+
+SAMPLES_PATH = os.path.join(os.path.dirname(__file__), "data", "answer_samples.json")
+
+
+def _best_of(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    with open(SAMPLES_PATH, encoding="utf-8") as f:
+        samples = json.load(f)
+    answer = "\n\n".join(samples)
+    tokens = re.findall(r"\S+\s*|\s+", answer)
+
+    def one_shot():
+        clean_response(answer)
+
+    def streamed():
+        cleaner = ResponseCleaner()
+        for token in tokens:
+            cleaner.feed(token)
+        cleaner.close()
+
+    def re_cleaned():
+        # What cleaning the whole answer so far on every token would cost
+        text = ""
+        for token in tokens[:500]:
+            text += token
+            clean_response(text)
+
+    print(f"corpus: {len(samples)} answers, {len(answer):,} characters, {len(tokens):,} tokens")
+    print(f"one-shot clean_response:       {_best_of(one_shot) * 1000:8.2f} ms")
+    print(f"streamed, one feed() per token: {_best_of(streamed) * 1000:8.2f} ms "
+          f"({_best_of(streamed) / len(tokens) * 1e6:.1f} us/token)")
+    print(f"re-cleaning every token (first 500 tokens): {_best_of(re_cleaned, 1) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import asyncio
+from types import SimpleNamespace
+
+from utils.assistant_batch import answer_questions_async
+
+
+def _event(name, **data):
+    return SimpleNamespace(event=name, data=SimpleNamespace(**data))
+
+
+class _Stream:
+    """Yields the given events, then fails like a dropped connection if `drop`."""
+
+    def __init__(self, events, drop):
+        self.events = events
+        self.drop = drop
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def __aiter__(self):
+        for event in self.events:
+            yield event
+        if self.drop:
+            raise TimeoutError("read timed out")
+
+
+class _Messages:
+    def __init__(self, text):
+        self.text = text
+
+    async def __aiter__(self):
+        block = SimpleNamespace(type="text", text=SimpleNamespace(value=self.text))
+        yield SimpleNamespace(role="assistant", content=[block])
+
+
+class _FakeAsyncClient:
+    def __init__(self, events, drop=True):
+        self.polled = []
+
+        async def poll(run_id, thread_id):
+            self.polled.append(run_id)
+            return SimpleNamespace(id=run_id, thread_id=thread_id, status="completed")
+
+        async def cancel(**kwargs):
+            pass
+
+        self.beta = SimpleNamespace(threads=SimpleNamespace(
+            create_and_run_stream=lambda **kwargs: _Stream(events, drop),
+            runs=SimpleNamespace(poll=poll, cancel=cancel),
+            messages=SimpleNamespace(list=lambda **kwargs: _Messages("Full answer")),
+        ))
+
+
+def _answer(client):
+    return asyncio.run(answer_questions_async("", "asst_1", "vs_1", ["question"], client=client))[0]
+
+
+def test_run_step_does_not_replace_the_run_before_a_drop():
+    client = _FakeAsyncClient([
+        _event("thread.run.created", id="run_1", thread_id="thread_1", status="queued"),
+        _event("thread.run.step.completed", id="step_1", thread_id="thread_1", status="completed"),
+    ])
+
+    result = _answer(client)
+
+    assert client.polled == ["run_1"]
+    assert (result["answer"], result["status"]) == ("Full answer", "completed")
+
+
+def test_stream_without_a_run_is_a_failed_question():
+    result = _answer(_FakeAsyncClient([], drop=False))
+
+    assert result["status"] == "failed"
@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import assistant
+from utils.answer_cache import AnswerCache
+
+FIRST = "What are the JSE Main Board listing requirements for structured products?"
+FOLLOW_UP = "Can you explain that second point in more detail?"
+
+
+def _app():
+    import streamlit as st
+
+    import assistant
+
+    for question in st.session_state.questions:
+        st.session_state.messages.append({"role": "user", "content": question})
+        assistant.run_llm(None, st.session_state.assistant, question)
+
+
+class _FakeRunSession:
+    runs = []
+
+    def __init__(self, client, thread_id, assistant_id, last_message_id=None, run_options=None):
+        self.last_message_id = last_message_id
+
+    def ask(self, user_prompt, on_text=None, context_messages=()):
+        _FakeRunSession.runs.append(user_prompt)
+        return f"Run answer {len(_FakeRunSession.runs)} to: {user_prompt}"
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = AnswerCache()
+    _FakeRunSession.runs = []
+    monkeypatch.setattr(assistant, "get_answer_cache", lambda: cache)
+    monkeypatch.setattr(assistant, "knowledge_version", lambda client, assistant: ("asst_1", "v1"))
+    monkeypatch.setattr(assistant, "RunSession", _FakeRunSession)
+    return cache
+
+
+def _ask(questions):
+    app = AppTest.from_function(_app)
+    app.session_state.questions = questions
+    app.session_state.messages = []
+    app.session_state.thread_id = "thread_1"
+    app.session_state.assistant = SimpleNamespace(id="asst_1")
+    app.run()
+    assert not app.exception
+    return [m["content"] for m in app.session_state.messages if m["role"] == "assistant"]
+
+
+def test_first_question_is_stored_and_served(cache):
+    _ask([FIRST])
+    assert len(cache) == 1
+
+    assert _ask([FIRST]) == [f"Run answer 1 to: {FIRST}"]
+    assert _FakeRunSession.runs == [FIRST]
+
+
+def test_follow_up_is_neither_stored_nor_served(cache):
+    # Another session asked the follow-up as its first question
+    cache.store(FOLLOW_UP, "An answer about someone else's conversation", ("asst_1", "v1"))
+
+    answers = _ask([FIRST, FOLLOW_UP])
+
+    assert answers[1] == f"Run answer 2 to: {FOLLOW_UP}"
+    assert _FakeRunSession.runs == [FIRST, FOLLOW_UP]
+    assert cache.lookup(FOLLOW_UP, ("asst_1", "v1"))["answer"] == "An answer about someone else's conversation"
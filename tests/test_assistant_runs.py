@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import pytest
+
+from utils.assistant_runs import RunError, RunSession, is_run_event
+
+
+def _event(name, **data):
+    return SimpleNamespace(event=name, data=SimpleNamespace(**data))
+
+
+def _delta(text):
+    block = SimpleNamespace(type="text", text=SimpleNamespace(value=text))
+    return _event("thread.message.delta", delta=SimpleNamespace(content=[block]))
+
+
+def _message(message_id, text):
+    block = SimpleNamespace(type="text", text=SimpleNamespace(value=text))
+    return SimpleNamespace(id=message_id, role="assistant", content=[block])
+
+
+class _Stream:
+    """Yields the given events, then fails like a read timeout if `drop`."""
+
+    def __init__(self, events, drop):
+        self.events = events
+        self.drop = drop
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        yield from self.events
+        if self.drop:
+            raise TimeoutError("read timed out")
+
+
+class _FakeClient:
+    def __init__(self, events, final_text, drop=True):
+        self.polls = 0
+        self.final_text = final_text
+        runs = SimpleNamespace(stream=lambda **kwargs: _Stream(events, drop), retrieve=self._retrieve,
+                               cancel=lambda **kwargs: None)
+        messages = SimpleNamespace(list=lambda **kwargs: [_message("msg_1", self.final_text)])
+        self.beta = SimpleNamespace(threads=SimpleNamespace(runs=runs, messages=messages))
+
+    def _retrieve(self, **kwargs):
+        self.polls += 1
+        return SimpleNamespace(status="completed")
+
+
+def test_run_step_events_are_not_run_events():
+    assert is_run_event(_event("thread.run.completed", status="completed"))
+    assert not is_run_event(_event("thread.run.step.completed", status="completed"))
+    assert not is_run_event(_event("thread.message.created", id="msg_1"))
+
+
+def test_step_completed_before_drop_still_polls_for_the_full_answer(monkeypatch):
+    monkeypatch.setattr("utils.assistant_runs.backoff_delay", lambda attempt: 0)
+    events = [
+        _event("thread.run.created", id="run_1", status="queued"),
+        _event("thread.run.in_progress", id="run_1", status="in_progress"),
+        _event("thread.run.step.created", id="step_1", status="in_progress"),
+        _event("thread.run.step.completed", id="step_1", status="completed"),
+        _event("thread.message.created", id="msg_1"),
+        _delta("Partial ans"),
+    ]
+    client = _FakeClient(events, "Partial answer, completed")
+    session = RunSession(client, "thread_1", "asst_1")
+
+    assert session.ask("question") == "Partial answer, completed"
+    assert session.status == "completed"
+    assert client.polls == 1
+
+
+def test_stream_without_a_run_is_a_failed_run():
+    client = _FakeClient([], "", drop=False)
+    session = RunSession(client, "thread_1", "asst_1")
+
+    with pytest.raises(RunError, match="before the run was created"):
+        session.ask("question")
+    assert client.polls == 0
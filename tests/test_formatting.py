@@ -0,0 +1,48 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from utils.formatting import format_accounting, format_column
+
+VALUES = [0.0, -0.0, 1.0, -1.0, 0.005, 0.015, -0.004, 1234.5, -1234567.891, 2.5e15, -9.99e20, 1e-12,
+          float("nan"), float("inf"), float("-inf")]
+
+
+def _f_string(v, decimals):
+    if not math.isfinite(v):
+        return ""
+    return f"({abs(v):,.{decimals}f})" if v < 0 else f"{v:,.{decimals}f}"
+
+
+def test_format_accounting_matches_the_f_string_formatter():
+    for decimals in (0, 1, 2, 4):
+        expected = [_f_string(v, decimals) for v in VALUES]
+        assert format_accounting(np.array(VALUES), decimals).tolist() == expected
+
+
+def test_format_accounting_matches_the_f_string_formatter_on_random_values():
+    rng = np.random.default_rng(7)
+    magnitudes = 10.0 ** rng.uniform(-4, 17, 20_000)
+    values = np.concatenate([
+        np.where(rng.random(20_000) < 0.5, -1, 1) * magnitudes,
+        np.round(rng.normal(0, 1e4, 20_000), 2),
+        np.arange(-2000, 2000) / 200,  # exact halves at 2 decimals (ties)
+    ])
+    for decimals in (0, 2, 3):
+        expected = [_f_string(v, decimals) for v in values.tolist()]
+        assert format_accounting(values, decimals).tolist() == expected
+
+
+def test_negative_zero_and_nan():
+    assert format_accounting(np.array([-0.0, np.nan]), 2).tolist() == ["-0.00", ""]
+
+
+def test_format_accounting_keeps_the_shape():
+    assert format_accounting(np.array([[1.0, -2.0], [np.nan, 3.0]]), 1).tolist() == [["1.0", "(2.0)"], ["", "3.0"]]
+    assert format_accounting(np.array([]), 2).shape == (0,)
+
+
+def test_mixed_column_formats_only_the_numbers():
+    column = pd.Series([-1500.0, "n/a", None, 2], name="Capital ZAR", dtype=object)
+    assert format_column(column).tolist() == ["(1,500.00)", "n/a", "", "2.00"]
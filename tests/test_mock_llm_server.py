@@ -0,0 +1,20 @@
+from openai import OpenAI
+
+from utils.assistant_runs import RunSession
+from utils.mock_llm_server import start_mock_server
+
+
+def test_streamed_message_id_is_the_stored_answer():
+    server = start_mock_server(first_token_seconds=0.0, tokens_per_second=1000.0, seed=1)
+    try:
+        client = OpenAI(api_key="mock", base_url=f"http://127.0.0.1:{server.server_port}/v1")
+        thread = client.beta.threads.create()
+        session = RunSession(client, thread.id, "asst_mock")
+
+        answer = session.ask("What is the JSE listing requirement?")
+
+        stored = [m for m in server.state.threads[thread.id] if m["role"] == "assistant"]
+        assert [m["id"] for m in stored] == [session.last_message_id]
+        assert answer == stored[0]["content"][0]["text"]["value"]
+    finally:
+        server.shutdown()
@@ -0,0 +1,68 @@
+import json
+import os
+import random
+import re
+
+import pytest
+
+from utils.response_cleaner import ResponseCleaner, clean_response
+
+SAMPLES_PATH = os.path.join(os.path.dirname(__file__), "data", "answer_samples.json")
+with open(SAMPLES_PATH, encoding="utf-8") as f:
+    SAMPLES = json.load(f)
+
+# Decimals, multiples and percentages such as 2.75%, 1.25x, 0.9625
+NUMBER_PATTERN = re.compile(r"\d+\.\d+(?:\.\d+)?[%x]?")
+
+
+def _stream(text, sizes):
+    """Cleans text fed in chunks of the given sizes, as streamed tokens arrive."""
+    cleaner = ResponseCleaner()
+    position = 0
+    for size in sizes:
+        cleaner.feed(text[position:position + size])
+        position += size
+    cleaner.feed(text[position:])
+    return cleaner.close()
+
+
+@pytest.mark.parametrize("sample", SAMPLES, ids=range(len(SAMPLES)))
+def test_chunked_output_equals_one_shot(sample):
+    expected = clean_response(sample)
+    rng = random.Random(0)
+    assert _stream(sample, [1] * len(sample)) == expected
+    for _ in range(50):
+        assert _stream(sample, [rng.randint(1, 12) for _ in range(len(sample) // 4)]) == expected
+    # Word-sized tokens, as the API streams them
+    tokens = re.findall(r"\S+\s*|\s+", sample)
+    assert _stream(sample, [len(token) for token in tokens]) == expected
+
+
+def test_update_matches_feed():
+    cleaner = ResponseCleaner()
+    sample = SAMPLES[2]
+    for end in range(0, len(sample), 7):
+        cleaner.update(sample[:end])
+    cleaner.update(sample)
+    assert cleaner.close() == clean_response(sample)
+
+
+@pytest.mark.parametrize("sample", SAMPLES, ids=range(len(SAMPLES)))
+def test_numbers_survive_and_citations_go(sample):
+    cleaned = clean_response(sample)
+    for number in NUMBER_PATTERN.findall(sample):
+        assert number in cleaned
+    assert not re.search(r"[【】]|\[\d+\]|\d+:\d+†", cleaned)
+    assert "\n\n" not in cleaned
+
+
+def test_numbered_items_start_lines():
+    cleaned = clean_response(SAMPLES[0])
+    assert cleaned.splitlines() == [
+        "The Financial Sector Conduct Authority (FSCA) regulates market conduct in structured finance "
+        "transactions. Its main roles are:",
+        "1. Licensing issuers and managers of securitisation schemes.",
+        "2. Supervising disclosure in offering circulars.",
+        "3. Enforcing the Financial Markets Act.",
+    ]
+    assert "from 2.75% to 2.25% once leverage falls below 1.25x." in clean_response(SAMPLES[3])
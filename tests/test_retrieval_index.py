@@ -0,0 +1,54 @@
+import pytest
+
+import utils.retrieval_index as retrieval_index
+from utils.retrieval_index import RetrievalIndex
+
+DOCUMENT = b"The JSE Main Board requires a subscribed capital of at least R50 million for listing."
+
+
+def test_failed_write_does_not_mark_the_document_indexed(tmp_path, monkeypatch):
+    index = RetrievalIndex(str(tmp_path))
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(retrieval_index, "_write_segment", fail)
+        with pytest.raises(OSError):
+            index.add_documents([("listing.txt", DOCUMENT)], project="a")
+    assert index.documents == {}
+
+    assert index.add_documents([("listing.txt", DOCUMENT)], project="a") == {"listing.txt": 1}
+    assert index.search("JSE subscribed capital", project="a")
+
+
+def test_documents_are_searched_per_project(tmp_path):
+    index = RetrievalIndex(str(tmp_path))
+    index.add_documents([("listing.txt", DOCUMENT)], project="a")
+
+    assert index.search("JSE subscribed capital", project="b") == []
+    # The same file uploaded to another project is indexed for it too
+    assert index.add_documents([("listing.txt", DOCUMENT)], project="b") == {"listing.txt": 1}
+    assert [passage["project"] for passage in index.search("JSE subscribed capital", project="b")] == ["b"]
+
+
+def test_merging_segments_keeps_every_passage(tmp_path):
+    index = RetrievalIndex(str(tmp_path))
+    for i in range(retrieval_index.MAX_SEGMENTS + 1):
+        index.add_documents([(f"doc{i}.txt", DOCUMENT + f" Facility {i}.".encode())], project="a")
+
+    assert len(index._segments) == 1
+    assert len(index) == retrieval_index.MAX_SEGMENTS + 1
+    assert len(RetrievalIndex(str(tmp_path))) == len(index)
+
+
+def test_project_passages_are_found_in_every_segment(tmp_path):
+    index = RetrievalIndex(str(tmp_path))
+    index.add_documents([("a1.txt", DOCUMENT)], project="a")
+    index.add_documents([("b1.txt", DOCUMENT + b" AltX.")], project="b")
+    index.add_documents([("a2.txt", DOCUMENT + b" Main Board.")], project="a")
+
+    for opened in (index, RetrievalIndex(str(tmp_path))):
+        passages = opened.search("JSE subscribed capital", k=10, project="a")
+        assert sorted(passage["name"] for passage in passages) == ["a1.txt", "a2.txt"]
+        assert {passage["project"] for passage in passages} == {"a"}
@@ -0,0 +1,157 @@
+# utils/answer_cache.py
+
+import os
+import re
+import threading
+import time
+
+import numpy as np
+import streamlit as st
+
+from utils.text_embedding import EMBEDDING_DIM, hashed_embedding, tokenize
+
+# Seconds a cached answer is served before the question goes to the assistant again.
+ANSWER_CACHE_TTL_SECONDS = float(os.environ.get("DONNA_ANSWER_CACHE_TTL_SECONDS", 24 * 60 * 60))
+
+# Minimum cosine similarity for a differently worded question to count as the same.
+ANSWER_CACHE_MIN_SIMILARITY = float(os.environ.get("DONNA_ANSWER_CACHE_MIN_SIMILARITY", 0.8))
+
+# Answers kept; the oldest are dropped beyond this.
+ANSWER_CACHE_MAX_ENTRIES = int(os.environ.get("DONNA_ANSWER_CACHE_MAX_ENTRIES", 2000))
+
+# Questions shorter than this are usually follow-ups ("and for AltX?") that
+# depend on the conversation, so they are never answered from the cache.
+MIN_QUESTION_WORDS = 5
+
+# Words that do not change what a question is about.
+STOP_WORDS = frozenset(
+    "a an and are as at be by can do does for from how in is it of on or s the their "
+    "there to used what when where which who why with".split()
+)
+
+_SPACE_PATTERN = re.compile(r"\s+")
+_PUNCTUATION_PATTERN = re.compile(r"[^\w\s]")
+
+
+def normalize_question(question):
+    """Case-folded question without punctuation or repeated spaces."""
+    return _SPACE_PATTERN.sub(" ", _PUNCTUATION_PATTERN.sub(" ", question.casefold())).strip()
+
+
+def content_words(question):
+    """The words of a question that say what it is about."""
+    return {word for word in tokenize(question) if word not in STOP_WORDS}
+
+
+class AnswerCache:
+    """
+    Process-wide cache of assistant answers, shared by all sessions.
+
+    A question is looked up by its normalized text first, then by the most
+    similar cached question in a flat index of hashed embeddings (one matrix
+    product). A similar question only counts if all of its content words also
+    appear in the cached question, so "Main Board vs AltX for equity" does
+    not get the answer to "... for structured products".
+
+    Answers belong to a knowledge `version` (assistant settings + vector
+    store contents); storing or looking up with a different version empties
+    the cache, as every answer may be out of date.
+    """
+
+    def __init__(self, ttl_seconds=ANSWER_CACHE_TTL_SECONDS, min_similarity=ANSWER_CACHE_MIN_SIMILARITY,
+                 max_entries=ANSWER_CACHE_MAX_ENTRIES, embed=hashed_embedding, dim=EMBEDDING_DIM):
+        self.ttl_seconds = ttl_seconds
+        self.min_similarity = min_similarity
+        self.max_entries = max_entries
+        self.embed = embed
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dim = dim
+        self._clear()
+
+    def _clear(self):
+        self._keys = []
+        self._words = []
+        self._answers = []
+        self._stored_at = np.empty(0, dtype=np.float64)
+        self._vectors = np.empty((0, self._dim), dtype=np.float32)
+        self._positions = {}
+
+    def _check_version(self, version):
+        if version != self.version:
+            self._clear()
+            self.version = version
+
+    def lookup(self, question, version):
+        """
+        The cached answer for a question as {"answer", "question",
+        "similarity"}, or None if there is no fresh enough match.
+        """
+        key = normalize_question(question)
+        if len(key.split()) < MIN_QUESTION_WORDS:
+            return None
+        vector = self.embed([key])[0]
+        with self._lock:
+            self._check_version(version)
+            fresh = self._stored_at >= time.time() - self.ttl_seconds
+            position = self._positions.get(key)
+            similarity = 1.0
+            if position is None and fresh.any():
+                similarities = np.where(fresh, self._vectors @ vector, -1.0)
+                position = int(np.argmax(similarities))
+                similarity = float(similarities[position])
+                if similarity < self.min_similarity or not content_words(key) <= self._words[position]:
+                    position = None
+            if position is None or not fresh[position]:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return {"answer": self._answers[position], "question": self._keys[position],
+                    "similarity": similarity}
+
+    def store(self, question, answer, version):
+        """Caches the answer to a question (a new answer replaces an old one)."""
+        key = normalize_question(question)
+        if len(key.split()) < MIN_QUESTION_WORDS or not answer:
+            return
+        vector = self.embed([key])
+        with self._lock:
+            self._check_version(version)
+            position = self._positions.get(key)
+            if position is not None:
+                self._answers[position] = answer
+                self._stored_at[position] = time.time()
+                return
+            if len(self._keys) >= self.max_entries:
+                self._drop_oldest(len(self._keys) - self.max_entries + 1)
+            self._positions[key] = len(self._keys)
+            self._keys.append(key)
+            self._words.append(content_words(key))
+            self._answers.append(answer)
+            self._stored_at = np.append(self._stored_at, time.time())
+            self._vectors = np.vstack([self._vectors, vector])
+
+    def _drop_oldest(self, n):
+        keep = np.sort(np.argsort(self._stored_at, kind="stable")[n:])
+        self._keys = [self._keys[i] for i in keep]
+        self._words = [self._words[i] for i in keep]
+        self._answers = [self._answers[i] for i in keep]
+        self._stored_at = self._stored_at[keep]
+        self._vectors = self._vectors[keep]
+        self._positions = {key: i for i, key in enumerate(self._keys)}
+
+    def invalidate(self):
+        """Drops every cached answer."""
+        with self._lock:
+            self._clear()
+
+    def __len__(self):
+        return len(self._keys)
+
+
+@st.cache_resource
+def get_answer_cache():
+    """Process-wide AnswerCache shared by all sessions."""
+    return AnswerCache()
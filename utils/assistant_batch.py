@@ -0,0 +1,178 @@
+# utils/assistant_batch.py
+
+import argparse
+import asyncio
+import csv
+import os
+import time
+
+import openai
+
+from utils.assistant_runs import (
+    MESSAGE_PAGE_SIZE,
+    RETRYABLE_ERRORS,
+    RUN_DEADLINE_SECONDS,
+    RUN_MAX_ATTEMPTS,
+    TERMINAL_STATUSES,
+    RunError,
+    backoff_delay,
+    delta_text,
+    is_run_event,
+    message_text,
+)
+from utils.llm_backend import make_async_client
+
+# Questions answered at the same time; the rest wait for a free slot.
+BATCH_CONCURRENCY = int(os.environ.get("DONNA_BATCH_CONCURRENCY", 4))
+
+# Columns of a batch result (and of its CSV export).
+RESULT_FIELDS = ("question", "answer", "status", "seconds")
+
+
+async def _stream_answer(client, assistant_id, vector_store_id, question, state, max_attempts, context=None):
+    """
+    Answers one question in its own thread (runs on one thread cannot run
+    concurrently) with a streaming create-and-run. Opening the stream is
+    retried with backoff; if the stream ends early after the run exists, the
+    run is polled to the end and its messages are read instead.
+
+    Without a vector_store_id the run gets no tools, and `context` (e.g.
+    passages from the local retrieval index) is sent with the question.
+    """
+    thread = {"messages": [{"role": "user", "content": f"{context}\n\nQuestion: {question}" if context else question}]}
+    options = {}
+    if vector_store_id:
+        thread["tool_resources"] = {"file_search": {"vector_store_ids": [vector_store_id]}}
+    else:
+        options["tools"] = []
+    for attempt in range(max_attempts):
+        text = ""
+        try:
+            async with client.beta.threads.create_and_run_stream(
+                assistant_id=assistant_id, thread=thread, **options
+            ) as stream:
+                async for event in stream:
+                    if event.event == "thread.run.created":
+                        state["run"] = event.data
+                    elif event.event == "thread.message.delta":
+                        text += delta_text(event.data.delta)
+                    elif event.event == "thread.run.requires_action":
+                        raise RunError("requires_action", "the assistant asked for a tool this app does not provide")
+                    elif event.event == "error":
+                        raise RunError("failed", str(getattr(event.data, "message", "")))
+                    if is_run_event(event):
+                        state["run"] = event.data
+                if state.get("run") is not None and state["run"].status in TERMINAL_STATUSES:
+                    return text, state["run"].status
+                break
+        except RunError:
+            raise
+        except Exception as e:
+            if state.get("run") is not None:
+                break
+            if not isinstance(e, RETRYABLE_ERRORS) or attempt + 1 == max_attempts:
+                raise
+            await asyncio.sleep(backoff_delay(attempt))
+
+    run = state.get("run")
+    if run is None:
+        raise RunError("failed", "the stream ended before the run was created")
+    run = await client.beta.threads.runs.poll(run_id=run.id, thread_id=run.thread_id)
+    state["run"] = run
+    messages = [
+        message async for message in client.beta.threads.messages.list(
+            thread_id=run.thread_id, run_id=run.id, order="asc", limit=MESSAGE_PAGE_SIZE
+        ) if message.role == "assistant"
+    ]
+    return message_text(messages), run.status
+
+
+async def _answer(client, assistant_id, vector_store_id, question, semaphore, deadline_seconds, max_attempts,
+                  context_for):
+    """One result dict (see RESULT_FIELDS); errors are recorded, not raised."""
+    async with semaphore:
+        started = time.monotonic()
+        state = {}
+        answer, status = "", "failed"
+        context = context_for(question) if context_for is not None else None
+        try:
+            answer, status = await asyncio.wait_for(
+                _stream_answer(client, assistant_id, vector_store_id, question, state, max_attempts, context),
+                timeout=deadline_seconds,
+            )
+        except asyncio.TimeoutError:
+            status = "timed_out"
+        except RunError as e:
+            status = e.status
+        except openai.OpenAIError as e:
+            status = f"error ({type(e).__name__})"
+
+        run = state.get("run")
+        if run is not None and status in ("timed_out", "requires_action"):
+            # Best-effort cancel so an abandoned run does not keep running
+            try:
+                await client.beta.threads.runs.cancel(thread_id=run.thread_id, run_id=run.id)
+            except openai.OpenAIError:
+                pass
+        return {"question": question, "answer": answer, "status": status,
+                "seconds": round(time.monotonic() - started, 1)}
+
+
+async def answer_questions_async(api_key, assistant_id, vector_store_id, questions,
+                                 concurrency=BATCH_CONCURRENCY, deadline_seconds=RUN_DEADLINE_SECONDS,
+                                 max_attempts=RUN_MAX_ATTEMPTS, on_result=None, client=None, context_for=None):
+    """
+    Answers all questions concurrently, at most `concurrency` at a time.
+    Returns one result dict per question, in the order of `questions`.
+    on_result(result, n_done) is called as each answer finishes.
+    context_for(question), if given, returns text sent along with it.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    own_client = client is None
+    client = client or make_async_client(api_key)
+    try:
+        tasks = [
+            asyncio.ensure_future(_answer(client, assistant_id, vector_store_id, question, semaphore,
+                                          deadline_seconds, max_attempts, context_for))
+            for question in questions
+        ]
+        for n_done, finished in enumerate(asyncio.as_completed(tasks), start=1):
+            result = await finished
+            if on_result is not None:
+                on_result(result, n_done)
+        return [task.result() for task in tasks]
+    finally:
+        if own_client:
+            await client.close()
+
+
+def answer_questions(api_key, assistant_id, vector_store_id, questions, **kwargs):
+    """Blocking wrapper around answer_questions_async, for Streamlit and scripts."""
+    return asyncio.run(answer_questions_async(api_key, assistant_id, vector_store_id, questions, **kwargs))
+
+
+def write_results_csv(results, file):
+    """Writes batch results to an open text file as CSV (RESULT_FIELDS columns)."""
+    writer = csv.DictWriter(file, fieldnames=RESULT_FIELDS)
+    writer.writeheader()
+    writer.writerows(results)
+
+
+if __name__ == "__main__":
+    # Scheduled use: python -m utils.assistant_batch questions.txt answers.csv
+    # with OPENAI_API_KEY, ASSISTANT_ID and VECTOR_STORE_ID in the environment.
+    parser = argparse.ArgumentParser(description="Answer a file of questions (one per line) with the assistant.")
+    parser.add_argument("questions", help="text file with one question per line")
+    parser.add_argument("output", help="CSV file to write the answers to")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY)
+    args = parser.parse_args()
+
+    with open(args.questions, encoding="utf-8") as f:
+        questions = [line.strip() for line in f if line.strip()]
+    results = answer_questions(
+        os.environ["OPENAI_API_KEY"], os.environ["ASSISTANT_ID"], os.environ["VECTOR_STORE_ID"], questions,
+        concurrency=args.concurrency,
+        on_result=lambda result, n_done: print(f"[{n_done}/{len(questions)}] {result['status']}: {result['question']}"),
+    )
+    with open(args.output, "w", encoding="utf-8", newline="") as f:
+        write_results_csv(results, f)
@@ -0,0 +1,203 @@
+# utils/assistant_runs.py
+
+import os
+import random
+import time
+
+import openai
+
+# Run statuses after which the run will not change any more.
+TERMINAL_STATUSES = frozenset({"completed", "failed", "cancelled", "expired", "incomplete"})
+
+# Overall time allowed for one answer (stream, retries and polling together).
+RUN_DEADLINE_SECONDS = float(os.environ.get("DONNA_RUN_DEADLINE_SECONDS", 120))
+
+# Retries of a stream that could not be opened, and the backoff between them.
+RUN_MAX_ATTEMPTS = 3
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+
+# Messages requested per page when reading a run's answer.
+MESSAGE_PAGE_SIZE = 20
+
+# Errors worth retrying: network problems, rate limits and server errors.
+RETRYABLE_ERRORS = (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+
+
+class RunError(Exception):
+    """A run that ended without an answer (failed, expired, timed out, ...)."""
+
+    def __init__(self, status, message=""):
+        super().__init__(f"run {status}" + (f": {message}" if message else ""))
+        self.status = status
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE_SECONDS, cap=BACKOFF_MAX_SECONDS, rng=random):
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2**attempt)]."""
+    return rng.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def _sleep_until(delay, deadline):
+    """Sleeps for delay seconds, or raises RunError if that passes the deadline."""
+    if time.monotonic() + delay >= deadline:
+        raise RunError("timed_out")
+    time.sleep(delay)
+
+
+def _cancel(client, thread_id, run_id):
+    """Best-effort cancel of a run that is still going."""
+    try:
+        client.beta.threads.runs.cancel(thread_id=thread_id, run_id=run_id)
+    except openai.OpenAIError:
+        pass
+
+
+def delta_text(delta):
+    """The text a thread.message.delta event adds to the answer."""
+    return "".join(block.text.value for block in (delta.content or [])
+                   if block.type == "text" and block.text is not None and block.text.value)
+
+
+def is_run_event(event):
+    """
+    True for events about the run itself (thread.run.*). Run step events
+    (thread.run.step.*, e.g. a finished file_search) carry their own status,
+    which is not the run's.
+    """
+    return event.event.startswith("thread.run.") and not event.event.startswith("thread.run.step.")
+
+
+def fetch_run_messages(client, thread_id, run_id, after=None):
+    """
+    The assistant messages a run created, oldest first. Only messages after
+    the `after` message ID are requested, so the cost does not grow with the
+    length of the thread; further pages are fetched only if there are any.
+    """
+    page = client.beta.threads.messages.list(
+        thread_id=thread_id, run_id=run_id, order="asc", limit=MESSAGE_PAGE_SIZE,
+        **({"after": after} if after else {})
+    )
+    return [message for message in page if message.role == "assistant"]
+
+
+def message_text(messages):
+    """The text content of a list of messages, joined in order."""
+    return "".join(block.text.value for message in messages
+                   for block in message.content if block.type == "text")
+
+
+class RunSession:
+    """
+    Drives one assistant answer from start to a terminal state: a streaming
+    run, retried with backoff when it cannot be opened, falling back to
+    polling (also with backoff) if the stream drops after the run exists.
+    Everything runs under one deadline. If the caller is interrupted (e.g.
+    Streamlit stops the script because the user navigated away) or the
+    deadline passes, the run is cancelled on the server.
+    """
+
+    def __init__(self, client, thread_id, assistant_id, deadline_seconds=RUN_DEADLINE_SECONDS,
+                 max_attempts=RUN_MAX_ATTEMPTS, last_message_id=None, run_options=None):
+        self.client = client
+        self.thread_id = thread_id
+        self.assistant_id = assistant_id
+        # Extra run parameters, e.g. tools or additional_instructions
+        self.run_options = run_options or {}
+        self.deadline_seconds = deadline_seconds
+        self.max_attempts = max_attempts
+        # Newest thread message seen so far; later reads start after it
+        self.last_message_id = last_message_id
+        self.run_id = None
+        self.status = None
+        self.text = ""
+
+    def ask(self, user_prompt, on_text=None, context_messages=()):
+        """
+        Adds user_prompt to the thread, runs the assistant and returns the
+        answer text. on_text(text_so_far) is called as tokens arrive.
+        context_messages ({"role", "content"} dicts) are added to the thread
+        before the prompt, e.g. earlier turns answered without a run.
+        Raises RunError if the run ends in any state other than completed.
+        """
+        deadline = time.monotonic() + self.deadline_seconds
+        seen_before_run = self.last_message_id
+        try:
+            self._stream([*context_messages, {"role": "user", "content": user_prompt}], on_text, deadline)
+            if self.run_id is None:
+                raise RunError("failed", "the stream ended before the run was created")
+            if self.status not in TERMINAL_STATUSES:
+                self._poll(deadline)
+                messages = fetch_run_messages(self.client, self.thread_id, self.run_id, seen_before_run)
+                if messages:
+                    self.last_message_id = messages[-1].id
+                self.text = message_text(messages)
+                if on_text is not None and self.text:
+                    on_text(self.text)
+        except BaseException:
+            if self.run_id is not None and self.status not in TERMINAL_STATUSES:
+                _cancel(self.client, self.thread_id, self.run_id)
+                self.status = "cancelled"
+            raise
+
+        if self.status != "completed":
+            raise RunError(self.status)
+        return self.text
+
+    def _stream(self, messages, on_text, deadline):
+        for attempt in range(self.max_attempts):
+            try:
+                with self.client.beta.threads.runs.stream(
+                    thread_id=self.thread_id,
+                    assistant_id=self.assistant_id,
+                    additional_messages=messages,
+                    **self.run_options,
+                    timeout=max(1.0, deadline - time.monotonic()),
+                ) as stream:
+                    for event in stream:
+                        self._on_event(event, on_text)
+                        if time.monotonic() >= deadline:
+                            raise RunError("timed_out")
+                return
+            except RunError:
+                raise
+            except Exception as e:
+                if self.run_id is not None:
+                    # The run exists; follow it by polling instead of starting another.
+                    # Errors reading an open stream come from the HTTP transport
+                    # (e.g. a read timeout) rather than as openai errors
+                    return
+                if not isinstance(e, RETRYABLE_ERRORS) or attempt + 1 == self.max_attempts:
+                    raise
+                _sleep_until(backoff_delay(attempt), deadline)
+
+    def _on_event(self, event, on_text):
+        if event.event == "thread.run.created":
+            self.run_id = event.data.id
+        if is_run_event(event):
+            self.status = event.data.status
+            if self.status == "requires_action":
+                # No client-side tools are registered, so nothing can satisfy it
+                raise RunError("requires_action", "the assistant asked for a tool this app does not provide")
+        elif event.event == "thread.message.created":
+            self.last_message_id = event.data.id
+        elif event.event == "thread.message.delta":
+            text = delta_text(event.data.delta)
+            if text:
+                self.text += text
+                if on_text is not None:
+                    on_text(self.text)
+        elif event.event == "error":
+            raise RunError("failed", str(getattr(event.data, "message", "")))
+
+    def _poll(self, deadline):
+        attempt = 0
+        while self.status not in TERMINAL_STATUSES:
+            _sleep_until(backoff_delay(attempt), deadline)
+            attempt += 1
+            try:
+                run = self.client.beta.threads.runs.retrieve(thread_id=self.thread_id, run_id=self.run_id)
+            except RETRYABLE_ERRORS:
+                continue
+            self.status = run.status
+            if self.status == "requires_action":
+                raise RunError("requires_action", "the assistant asked for a tool this app does not provide")
@@ -0,0 +1,74 @@
+# utils/bond_aggregates.py
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+def compute_issuer_aggregates(df):
+    """
+    Per-issuer aggregates over a whole bond dataset. Each table comes from a
+    single vectorized groupby across all rows, so cost does not grow with a
+    per-issuer Python loop. Returns a dict of DataFrames indexed by issuer:
+      - "summary": bond count, total/average nominal, first/last issue date
+      - "nominal_by_maturity": issuer x maturity year, summed nominal
+      - "issuance_by_month": issuer x issue month, summed nominal
+      - "status_mix": issuer x instrument status, bond count
+    Tables whose source columns are missing from df are omitted.
+    """
+    columns = set(df.columns)
+    keys = df["Issuer Name"]
+    # Sum in float64 whatever dtype the caller's frame uses
+    nominal = df["Nominal Amount"].astype("float64") if "Nominal Amount" in columns else None
+    aggregates = {}
+
+    spec = {"Bonds": ("Issuer Name", "size")}
+    frame = df[["Issuer Name"]].copy()
+    if nominal is not None:
+        frame["Nominal Amount"] = nominal
+        spec["Total Nominal"] = ("Nominal Amount", "sum")
+        spec["Average Nominal"] = ("Nominal Amount", "mean")
+    if "Issue Date" in columns:
+        frame["Issue Date"] = df["Issue Date"]
+        spec["First Issue"] = ("Issue Date", "min")
+        spec["Last Issue"] = ("Issue Date", "max")
+    aggregates["summary"] = frame.groupby("Issuer Name", observed=True).agg(**spec)
+
+    if nominal is not None and "Maturity Date Year" in columns:
+        aggregates["nominal_by_maturity"] = (
+            nominal.groupby([keys, df["Maturity Date Year"]], observed=True).sum().unstack(fill_value=0.0)
+        )
+
+    if nominal is not None and "Issue Date" in columns:
+        month = pd.Series(df["Issue Date"].to_numpy().astype("datetime64[M]"), index=df.index, name="Issue Month")
+        aggregates["issuance_by_month"] = (
+            nominal.groupby([keys, month], observed=True).sum().unstack(fill_value=0.0)
+        )
+
+    if "Instrument Status" in columns:
+        aggregates["status_mix"] = (
+            keys.groupby([keys, df["Instrument Status"]], observed=True).size().unstack(fill_value=0)
+        )
+
+    return aggregates
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def get_issuer_aggregates(dataset_key, _df):
+    """
+    Returns compute_issuer_aggregates for a dataset, computed once per
+    dataset_key (the DataFrame itself is not hashed).
+    """
+    return compute_issuer_aggregates(_df)
+
+
+def select_issuers(aggregates, issuers):
+    """Slices every aggregate table down to the given issuers (in that order)."""
+    selected = {}
+    for name, table in aggregates.items():
+        table = table.reindex(issuers)
+        if name != "summary":
+            # Drop years/months/statuses none of the chosen issuers have
+            table = table.loc[:, np.asarray(table.fillna(0).sum(axis=0) != 0)]
+        selected[name] = table
+    return selected
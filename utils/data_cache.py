@@ -0,0 +1,117 @@
+# utils/data_cache.py
+
+import hashlib
+import os
+import tempfile
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Where converted datasets live and how much disk they may use in total.
+CACHE_DIR = os.environ.get("DONNA_DATA_CACHE_DIR", os.path.join(".cache", "datasets"))
+CACHE_MAX_BYTES = int(os.environ.get("DONNA_DATA_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+# (absolute path, mtime_ns, size) -> content digest, so an unchanged local file
+# is only hashed once per process.
+_path_digests = {}
+
+
+def file_digest(file):
+    """
+    Returns the SHA-256 hex digest of a local path or a user-uploaded file.
+    Local paths are re-hashed only when their mtime or size changes.
+    """
+    if isinstance(file, str):
+        stat = os.stat(file)
+        stat_key = (os.path.abspath(file), stat.st_mtime_ns, stat.st_size)
+        digest = _path_digests.get(stat_key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(file, "rb") as fh:
+                for block in iter(lambda: fh.read(1 << 20), b""):
+                    sha.update(block)
+            digest = sha.hexdigest()
+            _path_digests[stat_key] = digest
+        return digest
+
+    # user-uploaded file (BytesIO-like); getvalue() leaves the read position alone
+    return hashlib.sha256(file.getvalue()).hexdigest()
+
+
+def cached_read(file, reader, variant=""):
+    """
+    Returns reader(file), served from an on-disk Arrow IPC copy when the same
+    file content (and variant, e.g. a schema name) has been read before.
+    Cache hits are memory-mapped instead of re-parsing the XLSX/CSV source.
+    The returned frame carries its cache key in df.attrs["dataset_key"], which
+    downstream caches (indexes, aggregates, figures) use to identify the data.
+    """
+    key = hashlib.sha256(f"{file_digest(file)}:{variant}".encode("utf-8")).hexdigest()
+    cache_path = os.path.join(CACHE_DIR, f"{key}.arrow")
+
+    if os.path.exists(cache_path):
+        try:
+            table = feather.read_table(cache_path, memory_map=True)
+            # Bump mtime so eviction treats this entry as recently used
+            os.utime(cache_path)
+            df = table.to_pandas()
+            df.attrs["dataset_key"] = key
+            return df
+        except (pa.ArrowException, OSError):
+            # Corrupt or concurrently evicted entry: fall through and rebuild it
+            pass
+
+    df = reader(file)
+    if df is None:
+        return None
+
+    tmp_path = None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # A unique temp file per write: sessions are threads of one process, so
+        # two of them may convert the same file at the same time
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, prefix=f"{key}.", suffix=".tmp")
+        os.close(fd)
+        feather.write_feather(df, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, cache_path)
+        evict()
+    except (pa.ArrowException, OSError, TypeError, ValueError):
+        # Frames Arrow cannot represent (e.g. mixed-type object columns) are
+        # simply not cached.
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    df.attrs["dataset_key"] = key
+    return df
+
+
+def evict(max_bytes=CACHE_MAX_BYTES):
+    """
+    Deletes least recently used cache entries until the cache fits in max_bytes.
+    """
+    if not os.path.isdir(CACHE_DIR):
+        return
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".arrow"):
+            continue
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def clear_cache():
+    """Removes every cached dataset."""
+    evict(max_bytes=0)
@@ -0,0 +1,111 @@
+# utils/figure_cache.py
+
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib.pyplot as plt
+import streamlit as st
+
+# Total bytes of rendered images kept in memory across all sessions.
+FIGURE_CACHE_MAX_BYTES = int(os.environ.get("DONNA_FIGURE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+# pyplot keeps global state, so figures are built and saved one at a time.
+_render_lock = threading.Lock()
+
+# Background renders for charts the user has not opened yet.
+_prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="figure-prefetch")
+
+
+class FigureCache:
+    """
+    LRU cache of rendered matplotlib figures stored as PNG/SVG bytes,
+    bounded by the total size of the stored images.
+    """
+
+    def __init__(self, max_bytes=FIGURE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._pending = set()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def get_or_render(self, key, render, fmt="png", dpi=150):
+        """
+        Returns the image bytes for key, calling render() (which must return a
+        new Figure) only on a miss. The figure is always closed after saving.
+        """
+        data = self.get(key)
+        if data is not None:
+            return data
+
+        with _render_lock:
+            # Another thread (e.g. a prefetch) may have rendered it meanwhile
+            data = self.get(key)
+            if data is not None:
+                return data
+            fig = render()
+            try:
+                buf = io.BytesIO()
+                fig.savefig(buf, format=fmt, dpi=dpi, bbox_inches="tight")
+            finally:
+                plt.close(fig)
+            data = buf.getvalue()
+            self.put(key, data)
+        return data
+
+    def prefetch(self, key, render, fmt="png", dpi=150):
+        """
+        Schedules get_or_render(key, render) on a background thread unless the
+        image is already cached or queued. render() must not call Streamlit.
+        """
+        with self._lock:
+            if key in self._entries or key in self._pending:
+                return
+            self._pending.add(key)
+        future = _prefetch_pool.submit(self.get_or_render, key, render, fmt, dpi)
+        future.add_done_callback(lambda _: self._discard_pending(key))
+
+    def _discard_pending(self, key):
+        with self._lock:
+            self._pending.discard(key)
+
+    def put(self, key, data):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            if len(data) > self.max_bytes:
+                return
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+@st.cache_resource
+def get_figure_cache():
+    """Process-wide FigureCache shared by all sessions."""
+    return FigureCache()
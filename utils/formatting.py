@@ -0,0 +1,171 @@
+# utils/formatting.py
+
+import numpy as np
+import pandas as pd
+
+# Decimal places by the unit a column name ends with; others use DEFAULT_DECIMALS.
+UNIT_DECIMALS = {"ZAR": 2, "BPS": 2, "%": 1}
+DEFAULT_DECIMALS = 2
+
+# Above this magnitude the integer fast path could overflow int64.
+_MAX_FAST = 2.0 ** 52
+
+_ZERO, _COMMA, _POINT, _OPEN, _CLOSE = (ord(c) for c in "0,.()")
+
+
+def column_decimals(name):
+    """Decimal places for a column, from its unit suffix (e.g. "CLN ZAR")."""
+    for unit, decimals in UNIT_DECIMALS.items():
+        if str(name).endswith(unit):
+            return decimals
+    return DEFAULT_DECIMALS
+
+
+# Character codes of "000".."999", for writing three digits per step.
+_TRIPLETS = (_ZERO + np.array([[n // 100, n // 10 % 10, n % 10] for n in range(1000)], dtype=np.uint32)).T.copy()
+
+
+def _format_group(units, n_whole, negative, decimals):
+    """
+    Formats integers (value x 10**decimals) that all have n_whole digits
+    before the point and the same sign, so every character sits in the same
+    column for every row. Built column by column, then viewed as strings.
+    """
+    whole_width = n_whole + (n_whole - 1) // 3
+    start = 1 if negative else 0
+    point = start + whole_width
+    width = point + (decimals + 1 if decimals else 0) + start
+    chars = np.empty((width, len(units)), dtype=np.uint32)
+
+    rest = units
+    if decimals:
+        rest = units // 10 ** decimals
+        fraction = units - rest * 10 ** decimals
+        for position in range(decimals):
+            higher = fraction // 10
+            chars[point + decimals - position] = _ZERO + (fraction - higher * 10)
+            fraction = higher
+        chars[point] = _POINT
+    # Whole part three digits at a time, right to left, commas in between
+    end = point
+    for triplet in range((n_whole + 2) // 3):
+        higher = rest // 1000
+        digits = min(3, n_whole - 3 * triplet)
+        np.take(_TRIPLETS[3 - digits:], rest - higher * 1000, axis=1, out=chars[end - digits:end])
+        rest = higher
+        end -= digits
+        if end > start:
+            end -= 1
+            chars[end] = _COMMA
+    if negative:
+        chars[0] = _OPEN
+        chars[-1] = _CLOSE
+    return np.ascontiguousarray(chars.T).view(f"<U{width}").ravel()
+
+
+def format_accounting(values, decimals=DEFAULT_DECIMALS):
+    """
+    Formats a whole array of numbers at once: thousands separators, fixed
+    decimals and brackets for negatives ('(1,234.50)'); NaN/inf become ''.
+    Matches format_negatives cell for cell, including '-0.00' for -0.0.
+    Returns an array of str with the same shape.
+
+    Values are grouped by digit count and sign; each group is assembled as a
+    matrix of character codes, one column per character position, so there is
+    no per-cell Python formatting except for rare exact-half and huge values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    shape = values.shape
+    values = values.ravel()
+    finite = np.isfinite(values)
+    scale = 10 ** decimals
+    scaled = np.abs(np.where(finite, values, 0.0)) * scale
+
+    # Cells where float rounding of the scaled value may differ from Python's
+    # (ties after scaling) or that would overflow int64 are formatted by Python
+    fraction = scaled - np.floor(scaled)
+    slow = finite & ((scaled >= _MAX_FAST) | (np.abs(fraction - 0.5) < 1e-6))
+    # -0.0 is not < 0, so it gets no brackets, but f-strings keep its sign
+    negative_zero = finite & (values == 0) & np.signbit(values)
+    fast = finite & ~slow & ~negative_zero
+    units = np.round(np.where(fast, scaled, 0.0)).astype(np.int64)
+
+    n_digits = np.ones(len(units), dtype=np.int64)
+    bound = 10
+    while (units >= bound).any():
+        n_digits += units >= bound
+        bound *= 10
+    n_whole = np.maximum(n_digits - decimals, 1)
+
+    # Sort rows by (digits before the point, sign); group 0 holds NaN/inf and
+    # slow cells. uint8 keys let argsort use a linear-time radix sort
+    groups = (n_whole * 2 + (values < 0)).astype(np.uint8)
+    groups[~fast] = 0
+    order = np.argsort(groups, kind="stable")
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(groups))))
+    parts = [
+        _format_group(units[order[bounds[group]:bounds[group + 1]]], group // 2, group % 2, decimals)
+        for group in range(1, len(bounds) - 1) if bounds[group + 1] > bounds[group]
+    ]
+    slow_rows = np.flatnonzero(slow)
+    slow_text = [f"({abs(v):,.{decimals}f})" if v < 0 else f"{v:,.{decimals}f}" for v in values[slow_rows]]
+
+    negative_zero_text = f"{-0.0:.{decimals}f}"
+
+    width = max([part.dtype.itemsize // 4 for part in parts] + [len(t) for t in slow_text]
+                + [len(negative_zero_text)])
+    text = np.zeros(len(values), dtype=f"<U{width}")
+    if parts:
+        text[order[bounds[1]:]] = np.concatenate(parts)
+    text[slow_rows] = slow_text
+    text[negative_zero] = negative_zero_text
+    return text.reshape(shape)
+
+
+def _is_number_type(cls):
+    return issubclass(cls, (int, float, np.number)) and not issubclass(cls, (bool, np.bool_))
+
+
+def _numeric_mask(values):
+    """
+    True where a cell of an object column holds a number (not bool/str).
+    Decided once per distinct type rather than once per cell.
+    """
+    types = list(map(type, values))
+    is_number = {cls: _is_number_type(cls) for cls in set(types)}
+    return np.fromiter(map(is_number.__getitem__, types), dtype=bool, count=len(types))
+
+
+def format_column(series, decimals=None):
+    """
+    Display strings for one column. Numeric columns are formatted in one
+    vectorized pass; in mixed (object) columns only the number cells are
+    formatted and strings are left as they are. `decimals` defaults to the
+    precision of the column's unit (see UNIT_DECIMALS).
+    """
+    if decimals is None:
+        decimals = column_decimals(series.name)
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return format_accounting(series.to_numpy(dtype=np.float64, na_value=np.nan), decimals)
+
+    values = series.to_numpy(dtype=object)
+    numeric = _numeric_mask(values)
+    numbers = format_accounting(values[numeric].astype(np.float64), decimals)
+    others = values[~numeric]
+    others = np.where(pd.isna(others), "", others).astype(str)
+    out = np.empty(len(values), dtype=np.result_type(numbers.dtype, others.dtype))
+    out[numeric] = numbers
+    out[~numeric] = others
+    return out
+
+
+def format_frame(df, text_columns=("Item",)):
+    """
+    A new DataFrame of display strings: every column except `text_columns`
+    formatted with format_column. The input DataFrame is not modified.
+    """
+    return pd.DataFrame(
+        {col: df[col].astype(str).to_numpy() if col in text_columns else format_column(df[col])
+         for col in df.columns},
+        index=df.index,
+    )
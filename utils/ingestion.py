@@ -0,0 +1,92 @@
+# utils/ingestion.py
+
+import pandas as pd
+import streamlit as st
+from pandas.api.types import union_categoricals
+
+from utils.data_cache import cached_read
+
+# Columns the bond workflows use, and the compact dtype each one is stored as.
+BOND_SCHEMA = {
+    "Issuer Name": "category",
+    "Issue Date": "datetime64[ns]",
+    "Maturity Date Year": "Int32",
+    "Nominal Amount": "float64",  # currency amounts; float32 would round them
+    "Instrument Status": "category",
+}
+
+# Rows per chunk when streaming large CSV files.
+CSV_CHUNK_ROWS = 250_000
+
+
+def load_data(file, schema=None, chunksize=CSV_CHUNK_ROWS):
+    """
+    Attempts to read an Excel or CSV file (local path or user upload) and
+    return a DataFrame.
+
+    If a schema ({column: dtype}) is given, only those columns are read and
+    each is converted to its declared dtype while parsing; CSV files are then
+    streamed in chunks of `chunksize` rows. Parsed results are cached on disk
+    per file content and schema (see utils.data_cache).
+    """
+    variant = repr(sorted(schema.items())) if schema else ""
+    try:
+        return cached_read(file, lambda f: _read_file(f, schema, chunksize), variant=variant)
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
+        return None
+
+
+def _read_file(file, schema, chunksize):
+    name = file if isinstance(file, str) else file.name
+    if not isinstance(file, str):
+        file.seek(0)
+
+    if schema is None:
+        if name.endswith(".xlsx"):
+            return pd.read_excel(file)
+        elif name.endswith(".csv"):
+            return pd.read_csv(file)
+        return None
+
+    usecols = lambda col: col in schema  # noqa: E731 - tolerates absent columns
+    if name.endswith(".xlsx"):
+        return _apply_schema(pd.read_excel(file, usecols=usecols), schema)
+    elif name.endswith(".csv"):
+        # Categorical columns are typed by the CSV parser itself; the rest are
+        # coerced per chunk so bad values become NaN/NaT instead of failing.
+        category_dtypes = {col: "category" for col, dtype in schema.items() if dtype == "category"}
+        reader = pd.read_csv(file, usecols=usecols, dtype=category_dtypes, chunksize=chunksize)
+        chunks = [_apply_schema(chunk, schema) for chunk in reader]
+        return _concat_chunks(chunks, schema)
+    return None
+
+
+def _apply_schema(df, schema):
+    """Converts each schema column present in df to its declared dtype."""
+    for col, dtype in schema.items():
+        if col not in df.columns:
+            continue
+        if dtype == "category":
+            df[col] = df[col].astype("category")
+        elif dtype.startswith("datetime64"):
+            df[col] = pd.to_datetime(df[col], errors="coerce").astype(dtype)
+        else:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+    return df
+
+
+def _concat_chunks(chunks, schema):
+    """
+    Concatenates CSV chunks, keeping categorical columns categorical
+    (pd.concat falls back to object when chunk categories differ).
+    """
+    if not chunks:
+        return pd.DataFrame(columns=list(schema))
+    for col, dtype in schema.items():
+        if dtype != "category" or col not in chunks[0].columns:
+            continue
+        categories = union_categoricals([chunk[col] for chunk in chunks]).categories
+        for chunk in chunks:
+            chunk[col] = chunk[col].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
@@ -0,0 +1,81 @@
+# utils/issuer_index.py
+
+import numpy as np
+import streamlit as st
+
+
+def normalize_issuer(name):
+    """Lower-cases and collapses whitespace so lookups ignore formatting."""
+    return " ".join(str(name).casefold().split())
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class IssuerIndex:
+    """
+    Lookup structure over a bond dataset's "Issuer Name" column.
+
+    Built once per dataset, it maps every distinct (normalized) issuer to the
+    row positions it occupies and keeps a trigram index over issuer names, so
+    substring searches only touch names sharing the query's trigrams instead
+    of scanning every row.
+    """
+
+    def __init__(self, issuers):
+        issuers = issuers.astype("category")
+        codes = issuers.cat.codes.to_numpy()
+        self.names = [str(name) for name in issuers.cat.categories]
+        self._normalized = [normalize_issuer(name) for name in self.names]
+
+        # Row positions per category code: one stable sort, then split by counts
+        valid = codes >= 0
+        order = np.argsort(codes, kind="stable")[np.count_nonzero(~valid):]
+        counts = np.bincount(codes[valid], minlength=len(self.names))
+        self._positions = np.split(order, np.cumsum(counts)[:-1])
+
+        self._codes_by_name = {}
+        self._trigram_postings = {}
+        for code, norm in enumerate(self._normalized):
+            self._codes_by_name.setdefault(norm, []).append(code)
+            for gram in _trigrams(norm):
+                self._trigram_postings.setdefault(gram, set()).add(code)
+
+    def search(self, query):
+        """
+        Returns the issuer names containing `query` (case-insensitive), sorted.
+        An empty query matches every issuer.
+        """
+        query = normalize_issuer(query)
+        if not query:
+            return sorted(self.names)
+        if len(query) < 3:
+            candidates = range(len(self.names))
+        else:
+            grams = sorted(_trigrams(query), key=lambda g: len(self._trigram_postings.get(g, ())))
+            candidates = set(self._trigram_postings.get(grams[0], ()))
+            for gram in grams[1:]:
+                candidates &= self._trigram_postings.get(gram, set())
+                if not candidates:
+                    break
+        matches = {code for code in candidates if query in self._normalized[code]}
+        return sorted(self.names[code] for code in matches)
+
+    def rows(self, issuers):
+        """Returns the sorted row positions for the given issuer names."""
+        codes = set()
+        for issuer in issuers:
+            codes.update(self._codes_by_name.get(normalize_issuer(issuer), ()))
+        if not codes:
+            return np.empty(0, dtype=np.intp)
+        return np.sort(np.concatenate([self._positions[code] for code in codes]))
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def get_issuer_index(dataset_key, _issuers):
+    """
+    Returns the IssuerIndex for a dataset, building it only the first time a
+    given dataset_key is seen (the issuer Series itself is not hashed).
+    """
+    return IssuerIndex(_issuers)
@@ -0,0 +1,70 @@
+# utils/llm_backend.py
+
+import os
+
+import streamlit as st
+from openai import AsyncOpenAI, OpenAI
+
+from utils.mock_llm_server import MOCK_DEFAULTS, start_mock_server
+
+# Which LLM backend the app talks to:
+#   "openai" - the OpenAI API, or any compatible server at DONNA_LLM_BASE_URL
+#   "mock"   - an in-process mock server (utils/mock_llm_server.py) with
+#              simulated latency and failures, for offline runs and load tests
+LLM_BACKEND = os.environ.get("DONNA_LLM_BACKEND", "openai")
+
+# API base URL for the "openai" backend; None means api.openai.com.
+LLM_BASE_URL = os.environ.get("DONNA_LLM_BASE_URL") or None
+
+# Model used for one-off prompts (summaries).
+CHAT_MODEL = os.environ.get("DONNA_CHAT_MODEL", "gpt-3.5-turbo")
+
+
+def mock_settings():
+    """MOCK_DEFAULTS overridden by DONNA_MOCK_<NAME> environment variables."""
+    settings = {}
+    for name, default in MOCK_DEFAULTS.items():
+        value = os.environ.get(f"DONNA_MOCK_{name.upper()}")
+        if value is not None:
+            settings[name] = int(value) if name == "seed" else float(value)
+    return settings
+
+
+@st.cache_resource
+def get_mock_server():
+    """The process-wide mock server of the "mock" backend, started on first use."""
+    return start_mock_server(**mock_settings())
+
+
+def base_url():
+    """API base URL for the configured backend."""
+    if LLM_BACKEND == "mock":
+        server = get_mock_server()
+        return f"http://127.0.0.1:{server.server_port}/v1"
+    if LLM_BACKEND != "openai":
+        raise ValueError(f"Unknown DONNA_LLM_BACKEND {LLM_BACKEND!r} (expected 'openai' or 'mock')")
+    return LLM_BASE_URL
+
+
+@st.cache_resource
+def get_client(api_key):
+    """Process-wide OpenAI client for the configured backend, reused by every session."""
+    return OpenAI(api_key=api_key or "mock", base_url=base_url())
+
+
+def make_async_client(api_key):
+    """
+    New AsyncOpenAI client for the configured backend. Async clients are
+    bound to the event loop they are used on, so they are not shared.
+    """
+    return AsyncOpenAI(api_key=api_key or "mock", base_url=base_url())
+
+
+def chat_completion(api_key, prompt, model=CHAT_MODEL, max_tokens=None):
+    """Text of a single-prompt chat completion."""
+    response = get_client(api_key).chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=max_tokens,
+    )
+    return response.choices[0].message.content
@@ -0,0 +1,328 @@
+# utils/load_test.py
+
+import argparse
+import datetime
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "streamlit_app.py")
+
+# Secrets the app reads; the benchmark never talks to the real services.
+BENCH_SECRETS = {"OPENAI_API_KEY": "bench", "ASSISTANT_ID": "asst_bench", "VECTOR_STORE_ID": "vs_bench"}
+
+# Longest a single rerun may take before it counts as an error.
+RERUN_TIMEOUT_SECONDS = 120
+
+# Share by which a step's p95 may grow over the baseline before --compare fails.
+REGRESSION_TOLERANCE = 0.2
+
+# Latency percentiles reported for each step.
+PERCENTILES = (50, 95, 99)
+
+# Questions the Assistant scenario asks, in turn; repeats hit the answer cache.
+BENCH_QUESTIONS = (
+    "What are the key differences in regulatory requirements between the JSE's Main Board and the AltX?",
+    "What role does the Financial Sector Conduct Authority play in structured finance transactions?",
+    "How do South African banks hedge currency volatility in cross-border structured finance deals?",
+)
+
+
+def _button(at, label):
+    return next(button for button in at.button if button.label == label)
+
+
+def _ask(at, session, round_):
+    at.chat_input[0].set_value(BENCH_QUESTIONS[(session + round_) % len(BENCH_QUESTIONS)])
+
+
+def _create_project(at, session, round_):
+    at.text_input(key="new_project_input").set_value(f"Bench {session}-{round_}")
+    _button(at, "Create Project").click()
+
+
+def _choose_loan_project(at, session, round_):
+    next(box for box in at.selectbox if box.label == "Select a Project").set_value("Athens")
+
+
+# What each simulated user does on each page: (step, action(at, session, round)).
+# Every scenario starts by opening its page (?page=...); each step is one rerun.
+SCENARIOS = {
+    "Assistant": ("Assistant", [
+        ("ask", _ask),
+    ]),
+    "Vault": ("Vault", [
+        ("create project", _create_project),
+    ]),
+    "RCF": ("Workflows", [
+        ("start", lambda at, *_: at.button(key="start_rcf").click()),
+        ("calculate", lambda at, *_: _button(at, "Calculate").click()),
+    ]),
+    "Bond analysis": ("Workflows", [
+        ("start", lambda at, *_: at.button(key="start_bond_analysis").click()),
+        ("compare issuers", lambda at, *_: at.radio(key="bond_mode").set_value("Compare issuers")),
+    ]),
+    "Loan generator": ("Workflows", [
+        ("start", lambda at, *_: at.button(key="start_loan_gen").click()),
+        ("choose project", _choose_loan_project),
+        ("generate", lambda at, *_: _button(at, "Generate Agreement Summary").click()),
+    ]),
+}
+
+
+def rss_bytes():
+    """Resident memory of this process (peak resident memory where /proc is missing)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _rerun(at, scenario, step, action, session, round_, records):
+    """Runs one step and records its latency and any exception the app raised."""
+    started = time.perf_counter()
+    error = None
+    try:
+        if action is not None:
+            action(at, session, round_)
+        at.run(timeout=RERUN_TIMEOUT_SECONDS)
+        if at.exception:
+            error = at.exception[0].message.splitlines()[0][:200]
+    except Exception as e:  # a widget the step needs is missing, or the rerun timed out
+        error = f"{type(e).__name__}: {e}"[:200]
+    if records is not None:
+        records.append({"scenario": scenario, "step": step,
+                        "seconds": time.perf_counter() - started, "error": error})
+
+
+def _session_pass(at, scenarios, session, round_, records):
+    for scenario in scenarios:
+        page, steps = SCENARIOS[scenario]
+        at.query_params["page"] = page
+        # Back to the workflow cards, as the "← Back to Workflows" button does
+        at.session_state["current_workflow"] = None
+        _rerun(at, scenario, "open", None, session, round_, records)
+        for step, action in steps:
+            _rerun(at, scenario, step, action, session, round_, records)
+
+
+def _session_worker(session, scenarios, rounds, warmup, start_barrier, results):
+    """One simulated user in its own process (AppTest's runtime is process-global)."""
+    try:
+        results.put(_run_session(session, scenarios, rounds, warmup, start_barrier))
+    except BaseException as e:
+        # Release the other sessions instead of leaving them at the barrier
+        start_barrier.abort()
+        results.put({"session": session, "failed": f"{type(e).__name__}: {e}"})
+
+
+def _run_session(session, scenarios, rounds, warmup, start_barrier):
+    from streamlit import config
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+
+    # Deprecation warnings from every rerun would drown the report
+    config.set_option("logger.level", "error")
+    set_log_level("error")
+    os.chdir(ROOT)
+    at = AppTest.from_file(APP_PATH, default_timeout=RERUN_TIMEOUT_SECONDS)
+    at.secrets.update(BENCH_SECRETS)
+
+    started = time.perf_counter()
+    for round_ in range(warmup):
+        _session_pass(at, scenarios, session, -1 - round_, None)
+    warmup_seconds = time.perf_counter() - started
+    gc.collect()
+    rss_before = rss_bytes()
+
+    start_barrier.wait()
+    records = []
+    started = time.perf_counter()
+    for round_ in range(rounds):
+        _session_pass(at, scenarios, session, round_, records)
+    finished = time.perf_counter()
+    gc.collect()
+    return {
+        "session": session, "records": records, "warmup_seconds": warmup_seconds,
+        "started": started, "finished": finished,
+        "rss_before_bytes": rss_before, "rss_after_bytes": rss_bytes(),
+    }
+
+
+def latency_summary(seconds):
+    """Count, mean, percentiles and max of a list of latencies, in milliseconds."""
+    ms = np.asarray(seconds, dtype=np.float64) * 1000
+    summary = {"count": int(ms.size), "mean_ms": round(float(ms.mean()), 2)}
+    for p in PERCENTILES:
+        summary[f"p{p}_ms"] = round(float(np.percentile(ms, p)), 2)
+    summary["max_ms"] = round(float(ms.max()), 2)
+    return summary
+
+
+def run_benchmark(sessions=4, rounds=3, scenarios=tuple(SCENARIOS), warmup=1, mock_settings=None):
+    """
+    Runs `sessions` simulated users at once, each in its own process driving
+    the app headlessly with AppTest through every scenario `rounds` times,
+    after `warmup` untimed rounds. All sessions share one mock LLM server
+    (unless mock_settings is None and DONNA_LLM_BACKEND selects another
+    backend). Returns the results as a JSON-serialisable dict.
+    """
+    server = None
+    if mock_settings is not None:
+        from utils.mock_llm_server import start_mock_server
+
+        server = start_mock_server(**mock_settings)
+        os.environ["DONNA_LLM_BACKEND"] = "openai"
+        os.environ["DONNA_LLM_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+
+    context = multiprocessing.get_context("spawn")
+    start_barrier = context.Barrier(sessions)
+    results = context.Queue()
+    workers = [
+        context.Process(target=_session_worker, args=(i, list(scenarios), rounds, warmup, start_barrier, results))
+        for i in range(sessions)
+    ]
+    for worker in workers:
+        worker.start()
+    # Read before joining: a worker does not exit until its result is consumed
+    session_results = sorted((results.get() for _ in workers), key=lambda r: r["session"])
+    for worker in workers:
+        worker.join()
+    if server is not None:
+        server.shutdown()
+    failed = [f"session {r['session']}: {r['failed']}" for r in session_results if "failed" in r]
+    if failed:
+        raise RuntimeError("; ".join(failed))
+
+    latencies = defaultdict(list)
+    errors = Counter()
+    for result in session_results:
+        for record in result["records"]:
+            latencies[record["scenario"], record["step"]].append(record["seconds"])
+            if record["error"]:
+                errors[f"{record['scenario']} / {record['step']}: {record['error']}"] += 1
+    wall_seconds = max(r["finished"] for r in session_results) - min(r["started"] for r in session_results)
+    reruns = sum(len(r["records"]) for r in session_results)
+    growth_mb = [(r["rss_after_bytes"] - r["rss_before_bytes"]) / 2 ** 20 for r in session_results]
+
+    pages = defaultdict(dict)
+    for (scenario, step), seconds in latencies.items():
+        pages[scenario][step] = latency_summary(seconds)
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "streamlit": _version("streamlit"),
+            "sessions": sessions,
+            "rounds": rounds,
+            "warmup_rounds": warmup,
+            "scenarios": list(scenarios),
+            "llm_backend": "mock" if server is not None else os.environ.get("DONNA_LLM_BACKEND", "openai"),
+            "mock_settings": mock_settings,
+        },
+        "throughput": {
+            "reruns": reruns,
+            "wall_seconds": round(wall_seconds, 3),
+            "reruns_per_second": round(reruns / wall_seconds, 2) if wall_seconds else None,
+        },
+        "all_reruns": latency_summary([s for seconds in latencies.values() for s in seconds]),
+        "pages": pages,
+        "memory": {
+            "rss_growth_mb_per_session": [round(mb, 2) for mb in growth_mb],
+            "mean_rss_growth_mb": round(float(np.mean(growth_mb)), 2),
+            "max_rss_after_mb": round(max(r["rss_after_bytes"] for r in session_results) / 2 ** 20, 1),
+        },
+        "warmup_seconds": [round(r["warmup_seconds"], 3) for r in session_results],
+        "errors": dict(errors),
+    }
+
+
+def _version(package):
+    try:
+        from importlib.metadata import version
+
+        return version(package)
+    except Exception:
+        return None
+
+
+def compare_results(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    Steps whose p95 latency grew by more than `tolerance` over the baseline,
+    plus a drop in throughput of the same size, as human-readable lines.
+    """
+    regressions = []
+    for scenario, steps in results["pages"].items():
+        for step, summary in steps.items():
+            before = baseline.get("pages", {}).get(scenario, {}).get(step)
+            if before and summary["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{scenario} / {step}: p95 {before['p95_ms']:.1f} ms -> {summary['p95_ms']:.1f} ms")
+    before = baseline.get("throughput", {}).get("reruns_per_second")
+    after = results["throughput"]["reruns_per_second"]
+    if before and after and after < before * (1 - tolerance):
+        regressions.append(f"throughput: {before:.2f} -> {after:.2f} reruns/s")
+    return regressions
+
+
+if __name__ == "__main__":
+    # python -m utils.load_test --sessions 8 --rounds 3 --out bench.json [--compare baseline.json]
+    from utils.mock_llm_server import MOCK_DEFAULTS
+
+    parser = argparse.ArgumentParser(description="Concurrent multi-session load test of the Streamlit app.")
+    parser.add_argument("--sessions", type=int, default=4, help="simulated users running at once")
+    parser.add_argument("--rounds", type=int, default=3, help="timed passes through the scenarios per user")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed passes before the timed ones")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--out", default="bench_results.json", help="where to write the JSON results")
+    parser.add_argument("--compare", help="baseline results JSON; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    parser.add_argument("--live", action="store_true",
+                        help="use the configured LLM backend instead of a shared mock server")
+    parser.add_argument("--first-token-seconds", type=float, default=MOCK_DEFAULTS["first_token_seconds"])
+    parser.add_argument("--tokens-per-second", type=float, default=MOCK_DEFAULTS["tokens_per_second"])
+    parser.add_argument("--error-rate", type=float, default=MOCK_DEFAULTS["error_rate"])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    mock_settings = None if args.live else {
+        "first_token_seconds": args.first_token_seconds, "tokens_per_second": args.tokens_per_second,
+        "error_rate": args.error_rate, "seed": args.seed,
+    }
+    results = run_benchmark(args.sessions, args.rounds, scenarios, args.warmup, mock_settings)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{results['throughput']['reruns']} reruns in {results['throughput']['wall_seconds']} s "
+          f"({results['throughput']['reruns_per_second']} reruns/s), "
+          f"mean RSS growth {results['memory']['mean_rss_growth_mb']} MB/session -> {args.out}")
+    for scenario, steps in results["pages"].items():
+        for step, summary in steps.items():
+            print(f"  {scenario:<15} {step:<16} p50 {summary['p50_ms']:>8.1f} ms  "
+                  f"p95 {summary['p95_ms']:>8.1f} ms  p99 {summary['p99_ms']:>8.1f} ms")
+    for error, count in results["errors"].items():
+        print(f"  ERROR x{count}: {error}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare_results(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"  REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,327 @@
+# utils/mock_llm_server.py
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Simulation settings; each can be overridden per server (and through
+# DONNA_MOCK_<NAME> environment variables, see utils/llm_backend.py).
+MOCK_DEFAULTS = {
+    "first_token_seconds": 0.4,   # median time to first token (log-normal)
+    "first_token_sigma": 0.5,     # spread of that log-normal
+    "tokens_per_second": 80.0,    # streaming speed once tokens flow
+    "answer_words": 60,           # words per answer
+    "error_rate": 0.0,            # share of requests answered with HTTP 500
+    "rate_limit_rate": 0.0,       # share of requests answered with HTTP 429
+    "drop_rate": 0.0,             # share of streams cut off mid-answer
+    "run_failure_rate": 0.0,      # share of runs that end as failed
+    "seed": None,                 # RNG seed for reproducible runs
+}
+
+_WORDS = ("the facility margin credit capital funding structure regulation listing requirement securitisation "
+          "vehicle exposure hedge currency board approval covenant tenor pricing risk").split()
+
+
+def _now():
+    return int(time.time())
+
+
+def _new_id(prefix):
+    return f"{prefix}_{uuid.uuid4().hex[:24]}"
+
+
+class MockState:
+    """Threads, messages and runs of the mock server, plus the simulation."""
+
+    def __init__(self, settings):
+        self.settings = {**MOCK_DEFAULTS, **settings}
+        self.rng = random.Random(self.settings["seed"])
+        self.lock = threading.Lock()
+        self.threads = {}
+        self.runs = {}
+        self.requests = 0
+
+    def chance(self, name):
+        with self.lock:
+            return self.rng.random() < self.settings[name]
+
+    def plan_answer(self, question):
+        """(answer words, seconds before the first token, seconds per token)."""
+        with self.lock:
+            first = self.settings["first_token_seconds"] * self.rng.lognormvariate(0, self.settings["first_token_sigma"])
+            words = [self.rng.choice(_WORDS) for _ in range(int(self.settings["answer_words"]))]
+        # A citation and a decimal number, as real answers have
+        words[len(words) // 2] += " 【4:0†source.pdf】"
+        answer = f"Mock answer to: {question[:80]}. " + " ".join(words) + " at 2.75%."
+        return re.findall(r"\S+\s*", answer), first, 1.0 / self.settings["tokens_per_second"]
+
+    def message(self, thread_id, role, text, run_id=None, assistant_id=None):
+        message = {
+            "id": _new_id("msg"), "object": "thread.message", "created_at": _now(), "thread_id": thread_id,
+            "role": role, "status": "completed", "attachments": [], "metadata": {}, "run_id": run_id,
+            "assistant_id": assistant_id,
+            "content": [{"type": "text", "text": {"value": text, "annotations": []}}],
+        }
+        with self.lock:
+            self.threads.setdefault(thread_id, []).append(message)
+        return message
+
+    def create_run(self, thread_id, assistant_id, messages):
+        for message in messages:
+            content = message["content"]
+            if isinstance(content, list):
+                content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+            self.message(thread_id, message.get("role", "user"), content)
+        question = next((m["content"] for m in reversed(messages) if m.get("role", "user") == "user"), "")
+        tokens, first, per_token = self.plan_answer(question if isinstance(question, str) else "")
+        failed = self.chance("run_failure_rate")
+        run = {
+            "id": _new_id("run"), "object": "thread.run", "created_at": _now(), "thread_id": thread_id,
+            "assistant_id": assistant_id, "status": "queued", "instructions": "", "model": "mock",
+            "tools": [], "parallel_tool_calls": True,
+        }
+        with self.lock:
+            self.runs[run["id"]] = {
+                "run": run, "tokens": tokens, "failed": failed,
+                "done_at": time.monotonic() + first + per_token * len(tokens),
+                "first": first, "per_token": per_token,
+                # The answer's ID, streamed in thread.message.created and kept when the run finishes
+                "message_id": _new_id("msg"),
+            }
+        return run
+
+    def run_status(self, run_id):
+        with self.lock:
+            record = self.runs[run_id]
+            run = record["run"]
+            if run["status"] not in ("cancelled", "completed", "failed"):
+                if time.monotonic() >= record["done_at"]:
+                    self._finish(record)
+                else:
+                    run["status"] = "in_progress"
+            return dict(run)
+
+    def _finish(self, record):
+        """Ends a run (lock held): stores its answer or marks it failed."""
+        run = record["run"]
+        if run["status"] in ("completed", "failed", "cancelled"):
+            return
+        if record["failed"]:
+            run["status"] = "failed"
+            return
+        run["status"] = "completed"
+        message = {
+            "id": record["message_id"], "object": "thread.message", "created_at": _now(), "thread_id": run["thread_id"],
+            "role": "assistant", "status": "completed", "attachments": [], "metadata": {}, "run_id": run["id"],
+            "assistant_id": run["assistant_id"],
+            "content": [{"type": "text", "text": {"value": "".join(record["tokens"]), "annotations": []}}],
+        }
+        self.threads.setdefault(run["thread_id"], []).append(message)
+
+    def finish(self, run_id):
+        with self.lock:
+            self._finish(self.runs[run_id])
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """
+    Enough of the OpenAI HTTP API for this app: assistants, threads,
+    streaming and polled runs, messages, vector stores and chat completions.
+    """
+
+    protocol_version = "HTTP/1.1"
+    state = None  # set per server class in start_mock_server
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, obj, code=200, headers=None):
+        body = json.dumps(obj).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, code, message, kind):
+        self._json({"error": {"message": message, "type": kind, "code": None, "param": None}}, code,
+                   {"retry-after": "0"} if code == 429 else None)
+
+    def _simulated_failure(self):
+        """Answers with a simulated 429/500 and returns True, some of the time."""
+        if self.state.chance("rate_limit_rate"):
+            self._error(429, "Rate limit reached (simulated)", "rate_limit_error")
+            return True
+        if self.state.chance("error_rate"):
+            self._error(500, "Server error (simulated)", "server_error")
+            return True
+        return False
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        with self.state.lock:
+            self.state.requests += 1
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")[1:]  # drop "v1"
+        if self._simulated_failure():
+            return
+        if parts[:1] == ["assistants"]:
+            return self._json({"id": parts[1], "object": "assistant", "created_at": 0, "model": "mock",
+                               "name": "Mock assistant", "description": None, "instructions": "", "tools": [],
+                               "metadata": {}})
+        if parts[:1] == ["vector_stores"]:
+            return self._json({"id": parts[1], "object": "vector_store", "created_at": 0, "name": "mock",
+                               "status": "completed", "usage_bytes": 0, "last_active_at": 0, "metadata": {},
+                               "file_counts": {"cancelled": 0, "completed": 0, "failed": 0, "in_progress": 0,
+                                               "total": 0}})
+        if len(parts) == 4 and parts[0] == "threads" and parts[2] == "runs":
+            return self._json(self.state.run_status(parts[3]))
+        if len(parts) == 3 and parts[0] == "threads" and parts[2] == "messages":
+            return self._list_messages(parts[1], parse_qs(url.query))
+        self._error(404, f"Unknown path {url.path}", "invalid_request_error")
+
+    def _list_messages(self, thread_id, query):
+        with self.state.lock:
+            messages = list(self.state.threads.get(thread_id, []))
+        if "run_id" in query:
+            messages = [m for m in messages if m["run_id"] == query["run_id"][0]]
+        if query.get("order", ["desc"])[0] == "desc":
+            messages.reverse()
+        if "after" in query:
+            ids = [m["id"] for m in messages]
+            after = query["after"][0]
+            messages = messages[ids.index(after) + 1:] if after in ids else messages
+        limit = int(query.get("limit", ["20"])[0])
+        page = messages[:limit]
+        self._json({"object": "list", "data": page, "has_more": len(messages) > limit,
+                    "first_id": page[0]["id"] if page else None, "last_id": page[-1]["id"] if page else None})
+
+    def do_POST(self):
+        with self.state.lock:
+            self.state.requests += 1
+        parts = urlparse(self.path).path.strip("/").split("/")[1:]
+        body = self._body()
+        if self._simulated_failure():
+            return
+        if parts == ["threads"]:
+            thread_id = _new_id("thread")
+            for message in body.get("messages", []):
+                self.state.message(thread_id, message.get("role", "user"), message["content"])
+            return self._json({"id": thread_id, "object": "thread", "created_at": _now(), "metadata": {},
+                               "tool_resources": body.get("tool_resources")})
+        if parts == ["threads", "runs"]:
+            thread_id = _new_id("thread")
+            run = self.state.create_run(thread_id, body["assistant_id"], body.get("thread", {}).get("messages", []))
+            return self._run_response(run, body, thread_created=True)
+        if len(parts) == 3 and parts[0] == "threads" and parts[2] == "runs":
+            run = self.state.create_run(parts[1], body["assistant_id"], body.get("additional_messages") or [])
+            return self._run_response(run, body)
+        if len(parts) == 5 and parts[2] == "runs" and parts[4] == "cancel":
+            with self.state.lock:
+                run = self.state.runs[parts[3]]["run"]
+                if run["status"] not in ("completed", "failed"):
+                    run["status"] = "cancelled"
+            return self._json(dict(run))
+        if len(parts) == 3 and parts[0] == "threads" and parts[2] == "messages":
+            return self._json(self.state.message(parts[1], body.get("role", "user"), body["content"]))
+        if parts == ["chat", "completions"]:
+            return self._chat_completion(body)
+        self._error(404, f"Unknown path {self.path}", "invalid_request_error")
+
+    def _run_response(self, run, body, thread_created=False):
+        if not body.get("stream"):
+            return self._json(self.state.run_status(run["id"]))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        record = self.state.runs[run["id"]]
+        message_id = record["message_id"]
+
+        def send(event, data):
+            self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        if thread_created:
+            send("thread.created", {"id": run["thread_id"], "object": "thread", "created_at": _now(), "metadata": {}})
+        send("thread.run.created", {**run, "status": "queued"})
+        time.sleep(record["first"])
+        send("thread.run.in_progress", {**run, "status": "in_progress"})
+        if record["failed"]:
+            self.state.finish(run["id"])
+            send("thread.run.failed", self.state.run_status(run["id"]))
+            self.wfile.write(b"event: done\ndata: [DONE]\n\n")
+            return
+        message = {"id": message_id, "object": "thread.message", "created_at": _now(), "thread_id": run["thread_id"],
+                   "role": "assistant", "status": "in_progress", "attachments": [], "metadata": {},
+                   "run_id": run["id"], "assistant_id": run["assistant_id"], "content": []}
+        send("thread.message.created", message)
+        drop_at = len(record["tokens"]) // 2 if self.state.chance("drop_rate") else None
+        for i, token in enumerate(record["tokens"]):
+            if i == drop_at:
+                # Simulated network failure; the run carries on server-side
+                self.wfile.flush()
+                return
+            send("thread.message.delta", {"id": message_id, "object": "thread.message.delta", "delta": {
+                "content": [{"index": 0, "type": "text", "text": {"value": token, "annotations": []}}]}})
+            time.sleep(record["per_token"])
+        self.state.finish(run["id"])
+        send("thread.run.completed", self.state.run_status(run["id"]))
+        self.wfile.write(b"event: done\ndata: [DONE]\n\n")
+
+    def _chat_completion(self, body):
+        prompt = body["messages"][-1]["content"] if body.get("messages") else ""
+        tokens, first, per_token = self.state.plan_answer(prompt if isinstance(prompt, str) else "")
+        time.sleep(first + per_token * len(tokens))
+        text = "".join(tokens)
+        self._json({
+            "id": _new_id("chatcmpl"), "object": "chat.completion", "created": _now(), "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "finish_reason": "stop", "logprobs": None,
+                         "message": {"role": "assistant", "content": text, "refusal": None}}],
+            "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(tokens),
+                      "total_tokens": len(prompt.split()) + len(tokens)},
+        })
+
+
+def start_mock_server(host="127.0.0.1", port=0, **settings):
+    """
+    Starts a mock OpenAI server in a background thread and returns it; its
+    API base URL is f"http://{host}:{server.server_port}/v1". `settings`
+    override MOCK_DEFAULTS; server.state exposes threads, runs and counts.
+    """
+    handler = type("Handler", (MockHandler,), {"state": MockState(settings)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = handler.state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    # Standalone use: python -m utils.mock_llm_server --port 8765, then run the
+    # app with DONNA_LLM_BASE_URL=http://127.0.0.1:8765/v1
+    parser = argparse.ArgumentParser(description="Mock OpenAI API server for offline runs and load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    for name, default in MOCK_DEFAULTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float if name != "seed" else int, default=default)
+    args = vars(parser.parse_args())
+    server = start_mock_server(args.pop("host"), args.pop("port"), **args)
+    print(f"Mock OpenAI API on http://{server.server_address[0]}:{server.server_port}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
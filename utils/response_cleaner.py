@@ -0,0 +1,105 @@
+# utils/response_cleaner.py
+
+import re
+
+# Everything clean_response changes, as one pattern scanned in a single pass:
+#   cite   - file_search citations (【4:0†source】, bare 4:0†source】) and [n]
+#            markers, with the spaces in front of them
+#   stray  - lone 【 or 】 left by malformed citations
+#   item   - the space before a numbered list item ("... done. 2. Next"),
+#            which becomes a line break; decimals like 2.75% are not items
+#   blank  - blank lines, collapsed to one line break
+# The leading look-ahead skips positions no alternative can start at
+# without trying each alternative there.
+_CLEAN_PATTERN = re.compile(
+    r"(?=[\s\d【】\[])"
+    r"(?:(?P<cite>[ \t]*(?:【[^】\n]*】|\d+:\d+†[^】]*】|\[\d+\]))"
+    r"|(?P<stray>[【】])"
+    r"|(?P<item>(?<=[.:;!?)】\]])\s+(?=\d{1,3}\.[ \t]))"
+    r"|(?P<blank>\n[ \t]*(?:\n[ \t]*)+))"
+)
+
+# End of the text that could still turn into a match once more text
+# arrives: an open citation, a "[12" marker, or spaces/digits that may be
+# followed by a citation or a list item.
+_UNFINISHED_PATTERN = re.compile(r"[\s\d:.]*(?:【[^】\n]*|\[\d*|\d+:\d+†[^】]*)?\Z")
+
+# Longest tail held back while streaming; beyond this it is not a citation.
+MAX_HELD_CHARS = 256
+
+# Characters of already-cleaned raw text kept for the list item look-behind.
+_CONTEXT_CHARS = 1
+
+_REPLACEMENTS = {"cite": "", "stray": "", "item": "\n", "blank": "\n"}
+
+
+class ResponseCleaner:
+    """
+    Incremental clean_response for streamed answers. feed() takes each new
+    chunk and returns the cleaned answer so far; only a short tail that
+    could still become a citation or list marker is held back until the
+    next chunk (or close()). Cleaning costs O(chunk), not O(answer), per
+    call, so a long answer is never re-cleaned from the start. The cleaned
+    prefix is kept as one string; extending and returning it are plain
+    copies, the only per-call work that grows with the answer.
+    """
+
+    def __init__(self):
+        self._cleaned = ""
+        self._pending = ""
+        self._context = ""
+        self.consumed = 0
+
+    def feed(self, chunk):
+        """Adds a chunk of raw answer text and returns the cleaned text so far."""
+        self.consumed += len(chunk)
+        self._pending += chunk
+        # Only the last MAX_HELD_CHARS can be held back, so only they are searched
+        held = _UNFINISHED_PATTERN.search(self._pending, max(0, len(self._pending) - MAX_HELD_CHARS))
+        cut = held.start() if held else len(self._pending)
+        if cut:
+            self._clean(self._pending[:cut])
+            self._pending = self._pending[cut:]
+        return self.text
+
+    def update(self, text_so_far):
+        """feed() for callers that pass the whole answer so far each time."""
+        if len(text_so_far) < self.consumed:
+            self.__init__()
+        return self.feed(text_so_far[self.consumed:])
+
+    def close(self):
+        """Cleans whatever is still held back and returns the final text."""
+        if self._pending:
+            self._clean(self._pending)
+            self._pending = ""
+        return self.text
+
+    @property
+    def text(self):
+        return self._cleaned.strip()
+
+    def _clean(self, segment):
+        # The previous segment's last character is in front so the list item
+        # look-behind works across chunks; matching starts after it
+        text = self._context + segment
+        position = len(self._context)
+        parts = []
+        for match in _CLEAN_PATTERN.finditer(text, position):
+            parts.append(text[position:match.start()])
+            parts.append(_REPLACEMENTS[match.lastgroup])
+            position = match.end()
+        parts.append(text[position:])
+        self._cleaned += "".join(parts)
+        self._context = text[-_CONTEXT_CHARS:]
+
+
+def clean_response(raw_text):
+    """
+    Removes citation markers (【...】, [n]) from an answer and puts numbered
+    list items on their own line, in one pass. Numbers such as 1.25x or
+    EURIBOR + 2.75% are left intact.
+    """
+    cleaner = ResponseCleaner()
+    cleaner.feed(raw_text)
+    return cleaner.close()
@@ -0,0 +1,369 @@
+# utils/retrieval_index.py
+
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import threading
+import uuid
+import zipfile
+import zlib
+from functools import partial
+
+import numpy as np
+import streamlit as st
+
+from utils.text_embedding import hashed_embedding, tokenize
+
+# Where the assistant's documents come from: "vector_store" (OpenAI
+# file_search over VECTOR_STORE_ID) or "local" (this index over Vault
+# uploads). Uploads are only indexed in local mode.
+RETRIEVAL_MODE = os.environ.get("DONNA_RETRIEVAL", "vector_store")
+
+# Where the local retrieval index lives.
+INDEX_DIR = os.environ.get("DONNA_RETRIEVAL_INDEX_DIR", os.path.join(".cache", "retrieval"))
+
+# Local embedding model: "hashed" (no model, works offline out of the box) or
+# the name of a sentence-transformers model available locally.
+EMBEDDING_MODEL = os.environ.get("DONNA_EMBEDDING_MODEL", "hashed")
+
+# Width of the hashed embeddings stored in the index.
+INDEX_EMBEDDING_DIM = 256
+
+# Passages are windows of this many words, overlapping by CHUNK_OVERLAP_WORDS.
+CHUNK_WORDS = 200
+CHUNK_OVERLAP_WORDS = 40
+
+# BM25 parameters (the usual defaults).
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Candidates taken from each ranker, and the constant of reciprocal rank fusion.
+FUSION_CANDIDATES = 50
+RRF_K = 60
+
+# Passages less similar than this to the query are not dense candidates, so
+# unrelated passages are not returned just because the index is small.
+MIN_DENSE_SIMILARITY = float(os.environ.get("DONNA_MIN_DENSE_SIMILARITY", 0.1))
+
+# Segments (one per upload batch) are merged into one beyond this many.
+MAX_SEGMENTS = 8
+
+_XML_TEXT_PATTERNS = {
+    ".docx": ("word/document.xml", re.compile(r"<w:t[^>]*>([^<]*)</w:t>|</w:p>")),
+    ".pptx": ("ppt/slides/slide", re.compile(r"<a:t>([^<]*)</a:t>|</a:p>")),
+}
+_XML_ENTITIES = {"&amp;": "&", "&lt;": "<", "&gt;": ">", "&quot;": '"', "&apos;": "'"}
+_ENTITY_PATTERN = re.compile("|".join(_XML_ENTITIES))
+
+
+def _office_text(data, suffix):
+    part, pattern = _XML_TEXT_PATTERNS[suffix]
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        names = sorted(name for name in archive.namelist() if name.startswith(part) and name.endswith(".xml"))
+        xml = "".join(archive.read(name).decode("utf-8") for name in names)
+    # Runs of one paragraph are joined as-is; paragraph ends become newlines
+    text = "".join(match.group(1) if match.group(1) is not None else "\n" for match in pattern.finditer(xml))
+    return _ENTITY_PATTERN.sub(lambda match: _XML_ENTITIES[match.group(0)], text)
+
+
+def _xlsx_text(data):
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    lines = []
+    for sheet in workbook.worksheets:
+        lines.append(sheet.title)
+        for row in sheet.iter_rows(values_only=True):
+            cells = [str(value) for value in row if value is not None]
+            if cells:
+                lines.append(" ".join(cells))
+    workbook.close()
+    return "\n".join(lines)
+
+
+def _pdf_text(data):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise ValueError("PDF text extraction needs the pypdf package") from None
+    return "\n".join(page.extract_text() or "" for page in PdfReader(io.BytesIO(data)).pages)
+
+
+def extract_text(name, data):
+    """
+    Plain text of an uploaded document: .docx/.pptx (read from their XML),
+    .xlsx (cell values), .pdf (needs pypdf) or any UTF-8 text file.
+    Raises ValueError for files it cannot read.
+    """
+    suffix = os.path.splitext(name)[1].lower()
+    try:
+        if suffix in _XML_TEXT_PATTERNS:
+            return _office_text(data, suffix)
+        if suffix in (".xlsx", ".xlsm"):
+            return _xlsx_text(data)
+        if suffix == ".pdf":
+            return _pdf_text(data)
+        return data.decode("utf-8")
+    except Exception as e:  # parser errors of zipfile, openpyxl or pypdf, undecodable text
+        raise ValueError(f"Cannot read text from {name}: {e}") from None
+
+
+def chunk_text(text, chunk_words=CHUNK_WORDS, overlap_words=CHUNK_OVERLAP_WORDS):
+    """Splits text into passages of chunk_words words, overlapping by overlap_words."""
+    words = text.split()
+    step = max(1, chunk_words - overlap_words)
+    return [" ".join(words[start:start + chunk_words])
+            for start in range(0, max(1, len(words) - overlap_words), step) if words[start:start + chunk_words]]
+
+
+def term_ids(tokens):
+    """Stable 32-bit ids of tokens (CRC32), the BM25 vocabulary of the index."""
+    return np.fromiter((zlib.crc32(token.encode("utf-8")) for token in tokens), dtype=np.uint32, count=len(tokens))
+
+
+def load_embedder(name=EMBEDDING_MODEL):
+    """
+    The embedding function for an EMBEDDING_MODEL name: texts -> float32
+    (n, dim) array of L2-normalized vectors.
+    """
+    if name == "hashed":
+        return partial(hashed_embedding, dim=INDEX_EMBEDDING_DIM)
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        raise ImportError(f"DONNA_EMBEDDING_MODEL={name} needs the sentence-transformers package") from None
+    model = SentenceTransformer(name)
+    return lambda texts: model.encode(list(texts), normalize_embeddings=True).astype(np.float32)
+
+
+def _write_segment(path, chunks, vectors):
+    """
+    Writes one segment: BM25 postings, vectors, the project of every passage
+    (as indexes into projects.json) and the passages, as .npy/.json files.
+    """
+    tokens = [tokenize(chunk["text"]) for chunk in chunks]
+    lengths = np.array([len(t) for t in tokens], dtype=np.float32)
+    ids = np.concatenate([term_ids(t) for t in tokens]) if tokens else np.empty(0, np.uint32)
+    owners = np.repeat(np.arange(len(chunks), dtype=np.int32), lengths.astype(np.int64))
+
+    # One posting per (term, chunk) with its frequency, grouped by term
+    pairs, freqs = np.unique(np.stack([ids.astype(np.int64), owners.astype(np.int64)], axis=1),
+                             axis=0, return_counts=True)
+    terms, starts = np.unique(pairs[:, 0], return_index=True)
+
+    os.makedirs(path)
+    np.save(os.path.join(path, "terms.npy"), terms.astype(np.uint32))
+    np.save(os.path.join(path, "offsets.npy"), np.append(starts, len(pairs)).astype(np.int64))
+    np.save(os.path.join(path, "postings.npy"), pairs[:, 1].astype(np.int32))
+    np.save(os.path.join(path, "freqs.npy"), freqs.astype(np.float32))
+    np.save(os.path.join(path, "lengths.npy"), lengths)
+    np.save(os.path.join(path, "vectors.npy"), vectors.astype(np.float32))
+    projects = sorted({chunk["project"] for chunk in chunks}, key=lambda project: project or "")
+    codes = {project: code for code, project in enumerate(projects)}
+    np.save(os.path.join(path, "chunk_projects.npy"),
+            np.array([codes[chunk["project"]] for chunk in chunks], dtype=np.int32))
+    with open(os.path.join(path, "projects.json"), "w", encoding="utf-8") as f:
+        json.dump(projects, f)
+    with open(os.path.join(path, "chunks.json"), "w", encoding="utf-8") as f:
+        json.dump(chunks, f)
+
+
+class _Segment:
+    """A written segment, memory-mapped."""
+
+    def __init__(self, path):
+        def load(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+        self.path = path
+        self.terms = load("terms")
+        self.offsets = load("offsets")
+        self.postings = load("postings")
+        self.freqs = load("freqs")
+        self.lengths = load("lengths")
+        self.vectors = load("vectors")
+        self.chunk_projects = load("chunk_projects")
+        with open(os.path.join(path, "projects.json"), encoding="utf-8") as f:
+            self.project_codes = {project: code for code, project in enumerate(json.load(f))}
+        with open(os.path.join(path, "chunks.json"), encoding="utf-8") as f:
+            self.chunks = json.load(f)
+
+    def postings_of(self, ids):
+        """(start, end) of each term's postings; start == end if absent."""
+        found = np.minimum(np.searchsorted(self.terms, ids), max(len(self.terms) - 1, 0))
+        present = (self.terms[found] == ids) if len(self.terms) else np.zeros(len(ids), dtype=bool)
+        starts = np.where(present, self.offsets[found], 0)
+        ends = np.where(present, self.offsets[found + 1], 0)
+        return starts, ends
+
+    def in_project(self, project):
+        """True for the passages of one project's documents."""
+        code = self.project_codes.get(project)
+        if code is None:
+            return np.zeros(len(self.lengths), dtype=bool)
+        return self.chunk_projects == code
+
+
+class RetrievalIndex:
+    """
+    Local hybrid (BM25 + dense vector) retrieval over Vault documents.
+
+    The index is a directory of segments, one per add_documents() call, so
+    new uploads are indexed without touching existing ones; segments are
+    merged once there are more than MAX_SEGMENTS. Every segment is a set of
+    .npy arrays that are memory-mapped, so opening the index reads almost
+    nothing and queries touch only the postings of the query terms and the
+    vector matrix. Results of the two rankers are combined with reciprocal
+    rank fusion.
+
+    One process writes the index (uploads happen in the Streamlit server);
+    manifest.json names the live segments and is replaced atomically.
+    """
+
+    def __init__(self, path=INDEX_DIR, embed=None, embedder_name=EMBEDDING_MODEL):
+        self.path = path
+        self.embed = embed or load_embedder(embedder_name)
+        self.embedder_name = embedder_name
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        manifest_path = os.path.join(path, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+            if self.manifest["embedder"] != embedder_name:
+                raise ValueError(f"Index at {path} was built with embedder {self.manifest['embedder']!r}, "
+                                 f"not {embedder_name!r}; delete it to rebuild")
+        else:
+            self.manifest = {"embedder": embedder_name, "segments": [], "documents": {}}
+        self._segments = [_Segment(os.path.join(path, name)) for name in self.manifest["segments"]]
+
+    @property
+    def documents(self):
+        """doc_id -> {"name", "project", "chunks"} for every indexed document."""
+        return self.manifest["documents"]
+
+    def __len__(self):
+        return sum(len(segment.chunks) for segment in self._segments)
+
+    def add_documents(self, files, project=None):
+        """
+        Indexes uploaded files ((name, bytes) pairs) as one new segment.
+        Files already indexed for the same project (same content) are
+        skipped. Returns {name: passages indexed, or an error message for
+        unreadable files}. A document is only recorded as indexed once its
+        segment is written.
+        """
+        added, chunks, new_documents = {}, [], {}
+        for name, data in files:
+            doc_id = hashlib.sha256((project or "").encode("utf-8") + b"\0" + data).hexdigest()
+            if doc_id in self.documents or doc_id in new_documents:
+                added[name] = 0
+                continue
+            try:
+                passages = chunk_text(extract_text(name, data))
+            except ValueError as e:
+                added[name] = str(e)
+                continue
+            added[name] = len(passages)
+            chunks += [{"doc": doc_id, "name": name, "project": project, "text": text} for text in passages]
+            new_documents[doc_id] = {"name": name, "project": project, "chunks": len(passages)}
+        if chunks:
+            vectors = self.embed([chunk["text"] for chunk in chunks])
+            with self._lock:
+                self._add_segment(chunks, vectors, new_documents)
+                if len(self._segments) > MAX_SEGMENTS:
+                    self._merge_segments()
+        return added
+
+    def _add_segment(self, chunks, vectors, documents=None, replaces=()):
+        """
+        Writes a segment, then publishes it (with `documents`, replacing the
+        `replaces` segments) in one swap of the segment list, so concurrent
+        searches see either the old or the new segments, never a mix.
+        """
+        name = uuid.uuid4().hex
+        _write_segment(os.path.join(self.path, name), chunks, vectors)
+        segment = _Segment(os.path.join(self.path, name))
+        self._segments = [*(s for s in self._segments if s not in replaces), segment]
+        self.documents.update(documents or {})
+        self._save_manifest()
+
+    def _merge_segments(self):
+        old = list(self._segments)
+        chunks = [chunk for segment in old for chunk in segment.chunks]
+        vectors = np.concatenate([np.asarray(segment.vectors) for segment in old])
+        self._add_segment(chunks, vectors, replaces=old)
+        for segment in old:
+            shutil.rmtree(segment.path, ignore_errors=True)
+
+    def _save_manifest(self):
+        self.manifest["segments"] = [os.path.basename(segment.path) for segment in self._segments]
+        tmp_path = os.path.join(self.path, "manifest.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, os.path.join(self.path, "manifest.json"))
+
+    def _bm25(self, query, segments):
+        """BM25 score of every passage, one array per segment."""
+        ids = np.unique(term_ids(tokenize(query)))
+        n_chunks = sum(len(segment.lengths) for segment in segments)
+        average_length = max(sum(float(segment.lengths.sum()) for segment in segments) / max(n_chunks, 1), 1.0)
+        ranges = [segment.postings_of(ids) for segment in segments]
+        df = sum(ends - starts for starts, ends in ranges)
+        idf = np.log1p((n_chunks - df + 0.5) / (df + 0.5))
+
+        scores = []
+        for segment, (starts, ends) in zip(segments, ranges):
+            score = np.zeros(len(segment.lengths), dtype=np.float32)
+            for weight, start, end in zip(idf, starts, ends):
+                if end > start:
+                    chunk = segment.postings[start:end]
+                    tf = segment.freqs[start:end]
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * segment.lengths[chunk] / average_length)
+                    score[chunk] += weight * tf * (BM25_K1 + 1) / (tf + norm)
+            scores.append(score)
+        return scores
+
+    def search(self, query, k=5, project=None):
+        """
+        The k passages most relevant to query, best first, as dicts with
+        "text", "name", "project" and "score" (fused rank score). Optionally
+        limited to one project's documents.
+        """
+        segments = self._segments
+        if not segments or not query.strip():
+            return []
+        bm25 = np.concatenate(self._bm25(query, segments))
+        vector = self.embed([query])[0]
+        dense = np.concatenate([segment.vectors @ vector for segment in segments])
+        if project is not None:
+            outside = ~np.concatenate([segment.in_project(project) for segment in segments])
+            bm25[outside] = 0
+            dense[outside] = -np.inf
+
+        fused = np.zeros(len(bm25), dtype=np.float64)
+        for scores, has_match in ((bm25, bm25 > 0), (dense, dense >= MIN_DENSE_SIMILARITY)):
+            n = min(FUSION_CANDIDATES, int(has_match.sum()))
+            if n:
+                top = np.argpartition(-scores, n - 1)[:n]
+                top = top[np.argsort(-scores[top], kind="stable")]
+                fused[top] += 1.0 / (RRF_K + np.arange(1, n + 1))
+        best = [i for i in np.argsort(-fused, kind="stable")[:k] if fused[i] > 0]
+        # Row of the whole index -> (segment, row within it)
+        starts = np.cumsum([0] + [len(segment.lengths) for segment in segments])
+        located = [(segments[n], i - starts[n]) for i, n in zip(best, np.searchsorted(starts, best, side="right") - 1)]
+        return [{**segment.chunks[row], "score": float(fused[i])} for i, (segment, row) in zip(best, located)]
+
+
+def format_passages(passages):
+    """Passages as a numbered context block for the assistant's instructions."""
+    return "\n\n".join(f"[{i}] ({passage['name']}) {passage['text']}" for i, passage in enumerate(passages, start=1))
+
+
+@st.cache_resource
+def get_retrieval_index():
+    """Process-wide RetrievalIndex over INDEX_DIR."""
+    return RetrievalIndex()
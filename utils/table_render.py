@@ -0,0 +1,339 @@
+# utils/table_render.py
+
+import hashlib
+import html
+import io
+import re
+from functools import partial
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import streamlit as st
+import streamlit.components.v1 as components
+from matplotlib.table import Table
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Font, PatternFill
+
+from utils.figure_cache import get_figure_cache
+from utils.formatting import format_column
+
+# Columns shown as text as-is, never number-formatted.
+TEXT_COLUMNS = ("Item",)
+
+# Row choices for paged tables; only the visible page is sent to the browser.
+PAGE_SIZES = (25, 50, 100, 250)
+
+# Excel number format matching the on-screen "(1,234.00)" negatives.
+XLSX_NUMBER_FORMAT = '#,##0.00;(#,##0.00)'
+
+HEADER_COLOR = "#4A5568"
+SECTION_COLOR = "#EBF8FF"
+SECTION_TEXT_COLOR = "#2C5282"
+BORDER_COLOR = "#E2E8F0"
+
+_TAG_RE = re.compile(r"<[^>]+>")
+
+TABLE_CSS = """
+<style>
+.rcf-table {
+    width: 100%;
+    border-collapse: collapse;
+    font-family: -apple-system, system-ui, BlinkMacSystemFont, "Segoe UI", Roboto;
+}
+.rcf-table thead th {
+    background-color: #4A5568;
+    color: white;
+    padding: 12px 16px;
+    text-align: left;
+    font-weight: 500;
+    border: 1px solid #2D3748;
+}
+.rcf-table td {
+    padding: 8px 16px;
+    border: 1px solid #E2E8F0;
+}
+.rcf-table tr.section-header {
+    background-color: #EBF8FF;
+}
+.rcf-table tr.section-header td {
+    color: #2C5282;
+    font-weight: 600;
+}
+.rcf-table tr:not(.section-header) {
+    background-color: white;
+}
+/* Align numeric columns right */
+.rcf-table td:not(:first-child) {
+    text-align: right;
+    font-family: "SFMono-Regular", Consolas, "Liberation Mono", Menlo, monospace;
+    color: #2D3748;
+}
+.rcf-table tr:has(td:empty) {
+    height: 8px;
+    background-color: white;
+}
+</style>
+"""
+
+
+def _plain_text(cell):
+    """Cell text without HTML markup (for image and spreadsheet exports)."""
+    return html.unescape(_TAG_RE.sub("", cell))
+
+
+def _text_column(series, escape=False):
+    """Cells of a column shown as text ('' for missing values)."""
+    text = series.astype(str).to_numpy(dtype=object)
+    text[np.asarray(series.isna())] = ""
+    if escape:
+        text = np.array([html.escape(cell) for cell in text], dtype=object)
+    return text.astype(str)
+
+
+def render_table(df, text_columns=TEXT_COLUMNS, escape=False):
+    """
+    Renders a DataFrame once into everything display_rendered_table needs:
+    the styled HTML plus the formatted and raw cells for PNG/XLSX exports.
+    The DataFrame is only read. Rows whose first cell is bold (<b>...) are
+    styled as section headers; text cells may contain HTML unless `escape`
+    is set. Returns a dict of plain Python values, so the result can be
+    cached.
+    """
+    columns = [str(col) for col in df.columns]
+    text = np.column_stack([
+        _text_column(df[col], escape) if col in text_columns else format_column(df[col])
+        for col in df.columns
+    ]) if len(df.columns) else np.empty((len(df), 0), dtype=str)
+    first = text[:, 0] if text.shape[1] else np.full(len(df), "")
+    section_rows = np.char.startswith(first.astype(str), "<b>")
+
+    head = "".join(f"<th>{html.escape(col) if escape else col}</th>" for col in columns)
+    body = "\n".join(
+        f'    <tr class="{"section-header" if section else "data-row"}">'
+        + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>"
+        for row, section in zip(text.tolist(), section_rows.tolist())
+    )
+    table_html = (
+        '<table class="rcf-table">\n'
+        f'  <thead>\n    <tr style="text-align: right;">{head}</tr>\n  </thead>\n'
+        f"  <tbody>\n{body}\n  </tbody>\n</table>"
+    )
+
+    raw = df.to_numpy(dtype=object).tolist()
+    digest = hashlib.sha1((table_html + repr(raw)).encode("utf-8")).hexdigest()
+    return {
+        "key": digest,
+        "html": TABLE_CSS + table_html,
+        "columns": columns,
+        "text": text.tolist(),
+        "values": raw,
+        "section_rows": section_rows.tolist(),
+    }
+
+
+def _table_figure(table):
+    """A matplotlib figure drawing a rendered table with the rcf-table styling."""
+    cells = [[_plain_text(cell) for cell in row] for row in table["text"]]
+    n_rows = len(cells) + 1
+    widths = [max([len(col)] + [len(row[c]) for row in cells]) + 2 for c, col in enumerate(table["columns"])]
+    total = float(sum(widths)) or 1.0
+
+    fig = plt.figure(figsize=(max(4.0, total * 0.09), 0.3 * n_rows + 0.2))
+    ax = fig.add_axes((0, 0, 1, 1))
+    ax.axis("off")
+    grid = Table(ax, loc="upper left")
+    height = 1.0 / n_rows
+    for c, col in enumerate(table["columns"]):
+        cell = grid.add_cell(0, c, widths[c] / total, height, text=col, loc="left", facecolor=HEADER_COLOR,
+                             edgecolor=BORDER_COLOR)
+        cell.get_text().set_color("white")
+    for r, row in enumerate(cells, start=1):
+        section = table["section_rows"][r - 1]
+        for c, text in enumerate(row):
+            cell = grid.add_cell(r, c, widths[c] / total, height, text=text, loc="left" if c == 0 else "right",
+                                 facecolor=SECTION_COLOR if section else "white", edgecolor=BORDER_COLOR)
+            if section:
+                cell.get_text().set_color(SECTION_TEXT_COLOR)
+                cell.get_text().set_fontweight("bold")
+    grid.auto_set_font_size(False)
+    grid.set_fontsize(9)
+    ax.add_table(grid)
+    return fig
+
+
+def table_png(table):
+    """PNG bytes of a rendered table, drawn server-side and cached by content."""
+    return get_figure_cache().get_or_render(("table", table["key"]), partial(_table_figure, table))
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _table_xlsx(key, _table):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Table"
+    sheet.append(_table["columns"])
+    header_fill = PatternFill("solid", fgColor=HEADER_COLOR.lstrip("#"))
+    section_fill = PatternFill("solid", fgColor=SECTION_COLOR.lstrip("#"))
+    for cell in sheet[1]:
+        cell.fill = header_fill
+        cell.font = Font(bold=True, color="FFFFFF")
+
+    for r, (raw_row, text_row) in enumerate(zip(_table["values"], _table["text"]), start=2):
+        section = _table["section_rows"][r - 2]
+        for c, (raw, text) in enumerate(zip(raw_row, text_row), start=1):
+            numeric = isinstance(raw, (int, float, np.number)) and not isinstance(raw, (bool, np.bool_))
+            if numeric and c > 1 and not np.isnan(raw):
+                cell = sheet.cell(row=r, column=c, value=float(raw))
+                cell.number_format = XLSX_NUMBER_FORMAT
+            else:
+                cell = sheet.cell(row=r, column=c, value=_plain_text(text) or None)
+                if c > 1:
+                    cell.alignment = Alignment(horizontal="right")
+            if section:
+                cell.fill = section_fill
+                cell.font = Font(bold=True, color=SECTION_TEXT_COLOR.lstrip("#"))
+
+    for c, col in enumerate(_table["columns"], start=1):
+        width = max([len(col)] + [len(_plain_text(row[c - 1])) for row in _table["text"]]) + 2
+        sheet.column_dimensions[sheet.cell(row=1, column=c).column_letter].width = width
+
+    buf = io.BytesIO()
+    workbook.save(buf)
+    return buf.getvalue()
+
+
+def table_xlsx(table):
+    """XLSX bytes of a rendered table (numbers kept numeric), cached by content."""
+    return _table_xlsx(table["key"], table)
+
+
+def display_rendered_table(table, key=None, file_name="rcf_table", height=800):
+    """
+    Shows a render_table result, with PNG and XLSX downloads that are only
+    generated (on the server) when clicked. No external scripts are loaded.
+    `key` must be unique when the same table is shown more than once.
+    """
+    key = key or table["key"]
+    components.html(table["html"], height=height, scrolling=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            label="📷 Download Image",
+            data=partial(table_png, table),
+            file_name=f"{file_name}.png",
+            mime="image/png",
+            key=f"{key}_png",
+            on_click="ignore",
+            width="stretch",
+        )
+    with col2:
+        st.download_button(
+            label="Download XLSX",
+            data=partial(table_xlsx, table),
+            file_name=f"{file_name}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            key=f"{key}_xlsx",
+            on_click="ignore",
+            width="stretch",
+        )
+
+
+def page_positions(df, sort_column=None, descending=False, filter_column=None, query=""):
+    """
+    Row positions of df after a case-insensitive substring filter (on one
+    column, or on every text column when filter_column is None) and a stable
+    sort (missing values last). Only positions are computed; no rows are
+    copied.
+    """
+    positions = np.arange(len(df))
+    if query:
+        if filter_column is not None:
+            columns = [filter_column]
+        else:
+            # Across "all columns" only text-like columns are searched
+            columns = [col for col in df.columns
+                       if isinstance(df[col].dtype, pd.CategoricalDtype) or not pd.api.types.is_numeric_dtype(df[col])
+                       and not pd.api.types.is_datetime64_any_dtype(df[col])] or list(df.columns)
+        mask = np.zeros(len(df), dtype=bool)
+        for col in columns:
+            series = df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # Match the categories once, then select rows by code
+                hits = series.cat.categories.astype(str).str.contains(query, case=False, regex=False)
+                mask |= np.isin(series.cat.codes.to_numpy(), np.flatnonzero(hits))
+            else:
+                mask |= np.asarray(series.astype(str).str.contains(query, case=False, regex=False), dtype=bool)
+        positions = np.flatnonzero(mask)
+    if sort_column is not None:
+        subset = df[sort_column].iloc[positions].reset_index(drop=True)
+        order = subset.sort_values(ascending=not descending, na_position="last", kind="stable").index.to_numpy()
+        positions = positions[order]
+    return positions
+
+
+def _csv_bytes(df, positions):
+    return df.iloc[positions].to_csv(index=False).encode("utf-8")
+
+
+def display_paged_table(df, key, data_key=None, page_size=50, file_name="table"):
+    """
+    Shows a large DataFrame one page at a time in the rcf-table styling, with
+    server-side sorting and filtering. Only the visible page is formatted and
+    sent to the browser. `data_key` identifies the data (e.g. a dataset key):
+    when given, the filtered/sorted row order is kept in the session, so
+    paging does not redo the sort.
+    """
+    columns = list(df.columns)
+    col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
+    with col1:
+        query = st.text_input("Filter", key=f"{key}_query", placeholder="Contains…").strip()
+    with col2:
+        filter_column = st.selectbox("in", ["All columns"] + columns, key=f"{key}_filter_column")
+    with col3:
+        sort_column = st.selectbox("Sort by", ["(none)"] + columns, key=f"{key}_sort")
+    with col4:
+        descending = st.checkbox("Desc", key=f"{key}_desc")
+    filter_column = None if filter_column == "All columns" else filter_column
+    sort_column = None if sort_column == "(none)" else sort_column
+
+    params = (data_key, len(df), query, filter_column, sort_column, descending)
+    cached = st.session_state.get(f"{key}_positions")
+    if data_key is not None and cached is not None and cached[0] == params:
+        positions = cached[1]
+    else:
+        positions = page_positions(df, sort_column, descending, filter_column, query)
+        if data_key is not None:
+            st.session_state[f"{key}_positions"] = (params, positions)
+
+    col5, col6 = st.columns([1, 1])
+    with col5:
+        size = st.selectbox("Rows per page", PAGE_SIZES,
+                            index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 1,
+                            key=f"{key}_page_size")
+    pages = max(1, -(-len(positions) // size))
+    # Back to the first page whenever the rows or the page size change
+    if st.session_state.get(f"{key}_page_params") != params + (size,):
+        st.session_state[f"{key}_page_params"] = params + (size,)
+        st.session_state[f"{key}_page"] = 1
+    with col6:
+        page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+    page = min(int(page), pages)
+    start = (page - 1) * size
+    window = df.iloc[positions[start:start + size]]
+
+    text_columns = [col for col in columns if not pd.api.types.is_float_dtype(df[col])]
+    table = render_table(window, text_columns=text_columns, escape=True)
+    components.html(table["html"], height=min(800, 60 + 38 * len(window)), scrolling=True)
+
+    filtered = f" (filtered from {len(df):,})" if len(positions) != len(df) else ""
+    shown = f"{start + 1:,}–{start + len(window):,}" if len(window) else "0"
+    st.caption(f"Rows {shown} of {len(positions):,}{filtered}")
+    st.download_button(
+        label="Download filtered rows (CSV)",
+        data=partial(_csv_bytes, df, positions),
+        file_name=f"{file_name}.csv",
+        mime="text/csv",
+        key=f"{key}_csv",
+        on_click="ignore",
+    )
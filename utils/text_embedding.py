@@ -0,0 +1,54 @@
+# utils/text_embedding.py
+
+import re
+import zlib
+
+import numpy as np
+
+# Width of the hashed embedding vectors.
+EMBEDDING_DIM = 1024
+
+# Weight of each feature kind; word trigrams are many per word, so lighter.
+WORD_WEIGHT = 1.0
+PAIR_WEIGHT = 1.0
+TRIGRAM_WEIGHT = 0.25
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Lower-cased word tokens of a text."""
+    return _WORD_PATTERN.findall(text.casefold())
+
+
+def _features(words):
+    features = [(word, WORD_WEIGHT) for word in words]
+    features += [(f"{a} {b}", PAIR_WEIGHT) for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"<{word}>"
+        features += [(padded[i:i + 3], TRIGRAM_WEIGHT) for i in range(len(padded) - 2)]
+    return features
+
+
+def hashed_embedding(texts, dim=EMBEDDING_DIM):
+    """
+    Local embedding: words, word pairs and character trigrams hashed into
+    `dim` signed buckets, L2-normalized, so the dot product of two vectors
+    is their cosine similarity. Deterministic across processes and needs no
+    model or network; texts with similar wording score high, synonyms do not.
+    Returns a float32 array of shape (len(texts), dim).
+    """
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        features = _features(tokenize(text))
+        if not features:
+            continue
+        hashes = np.fromiter((zlib.crc32(name.encode("utf-8")) for name, _ in features),
+                             dtype=np.uint32, count=len(features))
+        weights = np.fromiter((weight for _, weight in features), dtype=np.float32, count=len(features))
+        # The top bit picks the sign, so collisions tend to cancel out
+        weights[hashes >> 31 == 1] *= -1
+        np.add.at(vectors[row], hashes % dim, weights)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
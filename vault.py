@@ -4,6 +4,7 @@ import time
 import os
 import utils.helpers
 import openai_utils
+from utils.retrieval_index import RETRIEVAL_MODE, get_retrieval_index
 
 def display_vault():
     """
@@ -228,10 +229,12 @@ def display_vault():
 
         st.markdown("</div>", unsafe_allow_html=True)
 
-        # Upload new document
+        # Upload new document (the uploader stays open across the reruns it triggers)
         if upload_btn:
+            st.session_state.vault_upload_open = True
+        if st.session_state.get("vault_upload_open"):
             uploaded_files = st.file_uploader("Select files to upload", accept_multiple_files=True, key="vault_project_upload")
-            if uploaded_files:
+            if uploaded_files and st.button("Add to project", type="primary"):
                 for up_file in uploaded_files:
                     file_details = {
                         "name": up_file.name,
@@ -244,3 +247,21 @@ def display_vault():
                         st.session_state.projects[project]["files"].append(file_details)
 
                     st.success(f"Uploaded: {up_file.name}")
+
+                # Make the documents searchable by the assistant (local retrieval only),
+                # for questions asked with this project open
+                if RETRIEVAL_MODE == "local":
+                    try:
+                        indexed = get_retrieval_index().add_documents(
+                            [(up_file.name, up_file.getvalue()) for up_file in uploaded_files],
+                            project=project,
+                        )
+                    except (ImportError, OSError, ValueError) as e:
+                        st.error(f"Error indexing documents: {e}")
+                    else:
+                        for name, result in indexed.items():
+                            if isinstance(result, str):
+                                st.warning(f"Not searchable: {result}")
+                            elif result:
+                                st.caption(f"Indexed {result} passages of {name}")
+                st.session_state.vault_upload_open = False
@@ -1,18 +1,33 @@
 # workflows/bond_analysis.py
 
 import os
+from functools import partial
 import streamlit as st
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 import matplotlib as mpl
 
-from utils.helpers import load_data
+from utils.ingestion import BOND_SCHEMA, load_data
+from utils.issuer_index import get_issuer_index
+from utils.bond_aggregates import get_issuer_aggregates, select_issuers
+from utils.figure_cache import get_figure_cache
+from utils.table_render import display_paged_table
+
+# Default row count above which beeswarms are replaced by density views.
+SWARM_MAX_POINTS = int(os.environ.get("DONNA_SWARM_MAX_POINTS", 2000))
+# Widest maturity-year hexbin; longer year ranges share columns.
+HEXBIN_MAX_COLUMNS = 80
+# Violin KDEs are estimated from at most this many sampled rows.
+KDE_MAX_POINTS = 50_000
+# Name of the chart styling set up below; part of every cached figure's key.
+BOND_THEME = "economist-whitegrid-talk"
 
 def show_bond_analysis_workflow():
     """
-    Bond Analysis focusing on any Issuer Name containing 'inguza' (case-insensitive).
-    Three 'pop' visuals:
+    Bond Analysis for the issuers picked in the issuer search
+    (defaults to any Issuer Name containing 'inguza', case-insensitive).
+    A "Compare issuers" mode shows many issuers side by side instead.
+    Three 'pop' visuals, shown one at a time (computed when first opened):
       1) Maturity Year vs. Nominal (Beeswarm)
       2) Issue Date vs. Nominal (Scatter)
       3) Instrument Status vs. Nominal (Violin+Swarm)
@@ -21,7 +36,7 @@ def show_bond_analysis_workflow():
     and each axis calls ticklabel_format to avoid KeyError with rcParams.
     """
 
-    st.title("Inguza Bond Analysis Dashboard")
+    st.title("Bond Analysis Dashboard")
 
     # 1) Load Data
     default_file_path = os.path.join("data", "data.xlsx")
@@ -29,7 +44,7 @@ def show_bond_analysis_workflow():
     user_file = st.file_uploader("Upload your bond data", type=["xlsx", "csv"])
 
     if user_file:
-        df = load_data(user_file)
+        df = load_data(user_file, schema=BOND_SCHEMA)
         if df is not None:
             st.success(f"Using uploaded file: {user_file.name}")
         else:
@@ -37,7 +52,7 @@ def show_bond_analysis_workflow():
             return
     else:
         if os.path.exists(default_file_path):
-            df = load_data(default_file_path)
+            df = load_data(default_file_path, schema=BOND_SCHEMA)
             st.warning("No file uploaded; using default `data/data.xlsx`.")
         else:
             st.error("No file uploaded, and `data/data.xlsx` not found.")
@@ -47,30 +62,27 @@ def show_bond_analysis_workflow():
         st.error("No valid bond data loaded.")
         return
 
-    # 2) Filter for 'inguza' in Issuer Name (case-insensitive)
+    # 2) Pick issuers via the prebuilt issuer index (defaults to 'inguza')
     if "Issuer Name" not in df.columns:
-        st.error("Missing 'Issuer Name' column. Cannot filter for 'inguza'.")
+        st.error("Missing 'Issuer Name' column. Cannot filter by issuer.")
         return
 
-    mask_inguza = df["Issuer Name"].str.contains("inguza", case=False, na=False)
-    df_inguza = df[mask_inguza].copy()
-
-    if df_inguza.empty:
-        st.warning("No data found where Issuer Name contains 'inguza'. Check your dataset.")
+    mode = st.radio("Analysis mode", ["Single issuer view", "Compare issuers"], horizontal=True, key="bond_mode")
+    if mode == "Compare issuers":
+        show_issuer_comparison(df)
         return
 
-    st.markdown(f"**Data for Inguza** – Rows: {len(df_inguza):,}")
-    st.dataframe(df_inguza.head(5), use_container_width=True)
-
-    # 3) Minimal cleaning: convert columns if they exist
-    if "Issue Date" in df_inguza.columns:
-        df_inguza["Issue Date"] = pd.to_datetime(df_inguza["Issue Date"], errors="coerce")
+    df_issuer, issuer_label, issuers = pick_issuers(df)
+    if df_issuer is None:
+        return
 
-    if "Maturity Date Year" in df_inguza.columns:
-        df_inguza["Maturity Date Year"] = pd.to_numeric(df_inguza["Maturity Date Year"], errors="coerce")
+    st.markdown(f"**Data for {issuer_label}** – Rows: {len(df_issuer):,}")
+    dataset_key = df.attrs.get("dataset_key")
+    display_paged_table(df_issuer, key="bond_rows", file_name="bond_rows",
+                        data_key=(dataset_key, issuers) if dataset_key else None)
 
-    if "Nominal Amount" in df_inguza.columns:
-        df_inguza["Nominal Amount"] = pd.to_numeric(df_inguza["Nominal Amount"], errors="coerce")
+    # 3) Dtypes (datetime Issue Date, numeric Maturity/Nominal, categorical
+    #    Issuer/Status) are already applied by load_data via BOND_SCHEMA.
 
     # 4) Seaborn "Economist Style" Setup
     sns.set_theme(style="whitegrid", context="talk")
@@ -80,121 +92,263 @@ def show_bond_analysis_workflow():
     mpl.rcParams["axes.titlesize"] = 14
     mpl.rcParams["axes.labelsize"] = 12
 
-    # 5) Create 3 Tabs
-    tab1, tab2, tab3 = st.tabs([
-        "Maturity vs. Nominal",
-        "Issue Date vs. Nominal",
-        "Status vs. Nominal"
-    ])
+    # 5) Large-data mode: above this many rows the beeswarms switch to
+    #    density views (hexbin / sampled strip) instead of exact point placement
+    max_swarm_points = st.number_input(
+        "Exact beeswarm up to (rows)",
+        min_value=100, value=SWARM_MAX_POINTS, step=500, key="bond_swarm_max_points",
+        help="Larger selections are drawn as density plots, which stay fast on 100k+ rows."
+    )
+
+    # Rendered charts are cached as PNG bytes per dataset, issuer selection,
+    # chart and theme, so reruns that don't change these skip matplotlib.
+    figure_cache = get_figure_cache()
+    chart_key = (df.attrs.get("dataset_key", id(df)), issuers, BOND_THEME)
+
+    # 6) Chart sections, evaluated lazily: only the selected chart is computed
+    #    on a rerun; the others can be rendered into the cache in the background
+    view = st.radio("Chart", list(BOND_CHARTS), horizontal=True, key="bond_chart_view")
+    render_all = st.checkbox("Render other charts in background", value=True, key="bond_chart_prefetch")
+
+    subsets = {}
+    for name in (BOND_CHARTS if render_all else [view]):
+        chart = BOND_CHARTS[name]
+        if chart["columns"].issubset(df_issuer.columns):
+            subsets[name] = df_issuer.dropna(subset=chart["columns"])
+
+    def render_job(name):
+        return partial(BOND_CHARTS[name]["plot"], subsets[name], issuer_label, max_swarm_points)
+
+    chart = BOND_CHARTS[view]
+    st.subheader(chart["title"])
+    if view not in subsets:
+        st.warning(f"Missing columns for this plot: {chart['columns']}.")
+    elif subsets[view].empty:
+        st.info(chart["empty_message"])
+    else:
+        if chart["large_mode"] and len(subsets[view]) > max_swarm_points:
+            st.caption(f"{len(subsets[view]):,} rows – showing {chart['large_mode']}.")
+        st.image(figure_cache.get_or_render(chart_key + (view, max_swarm_points), render_job(view)))
+
+    if render_all:
+        for name, subset in subsets.items():
+            if name != view and not subset.empty:
+                figure_cache.prefetch(chart_key + (name, max_swarm_points), render_job(name))
+
+    st.success(f"{issuer_label} Bond Analysis complete!")
+
+
+def plot_maturity_vs_nominal(subset, label, max_swarm_points=SWARM_MAX_POINTS):
+    """
+    Beeswarm of Nominal Amount per Maturity Year. Above max_swarm_points rows
+    a log-count hexbin is drawn instead, since swarm placement scales badly.
+    """
+    # Year 0 (and missing years) mean "no maturity" in the source data; on a
+    # year axis they would stretch the chart back to year 0
+    subset = subset[subset["Maturity Date Year"].fillna(0) > 0]
+    fig, ax = plt.subplots(figsize=(8, 5))
+    if subset.empty:
+        ax.text(0.5, 0.5, "No bonds with a maturity year", ha="center", va="center", transform=ax.transAxes)
+    elif len(subset) <= max_swarm_points:
+        # Maturity Date Year as string/categorical for beeswarm
+        data = subset.assign(**{"Maturity Date Year": subset["Maturity Date Year"].astype(int).astype(str)})
+        sns.swarmplot(
+            x="Maturity Date Year",
+            y="Nominal Amount",
+            data=data,
+            color="dodgerblue",
+            size=5,
+            ax=ax
+        )
+        ax.tick_params(axis="x", rotation=45)
+    else:
+        years = subset["Maturity Date Year"].to_numpy(dtype="float64")
+        nominal = subset["Nominal Amount"].to_numpy(dtype="float64")
+        n_years = min(int(years.max() - years.min()) + 1, HEXBIN_MAX_COLUMNS)
+        hexes = ax.hexbin(years, nominal, gridsize=(n_years, 40), bins="log", cmap="Blues", mincnt=1)
+        fig.colorbar(hexes, ax=ax, label="Bonds (log scale)")
+    ax.set_title(f"{label} – Maturity Year vs. Nominal Amount")
+    ax.set_xlabel("Maturity Year")
+    ax.set_ylabel("Nominal Amount (ZAR)")
+
+    # Force plain style numeric formatting on Y-axis
+    ax.ticklabel_format(style="plain", axis="y", useOffset=False)
+    return fig
+
+
+def plot_issue_date_vs_nominal(subset, label):
+    """Scatter of Nominal Amount against Issue Date."""
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.scatter(
+        subset["Issue Date"],
+        subset["Nominal Amount"],
+        color="darkred",
+        alpha=0.6,
+        s=40
+    )
+    ax.set_title(f"{label} – Issue Date vs. Nominal Amount")
+    ax.set_xlabel("Issue Date")
+    ax.set_ylabel("Nominal Amount (ZAR)")
+    ax.tick_params(axis="x", rotation=30)
+
+    # Force plain style numeric formatting on Y-axis
+    ax.ticklabel_format(style="plain", axis="y", useOffset=False)
+    return fig
+
+
+def plot_status_vs_nominal(subset, label, max_swarm_points=SWARM_MAX_POINTS):
+    """
+    Violin of Nominal Amount per Instrument Status with a swarm on top.
+    Above max_swarm_points rows the swarm becomes a strip plot of a random
+    sample, and the violin KDEs use at most KDE_MAX_POINTS sampled rows.
+    """
+    fig, ax = plt.subplots(figsize=(8, 5))
+    kde_data = subset.sample(KDE_MAX_POINTS, random_state=0) if len(subset) > KDE_MAX_POINTS else subset
+    # Violin plot
+    sns.violinplot(
+        x="Instrument Status",
+        y="Nominal Amount",
+        data=kde_data,
+        inner=None,
+        color="lightgray",
+        cut=0,
+        ax=ax
+    )
+    if len(subset) <= max_swarm_points:
+        # Swarm on top
+        sns.swarmplot(
+            x="Instrument Status",
+            y="Nominal Amount",
+            data=subset,
+            size=4,
+            edgecolor="gray",
+            linewidth=0.5,
+            ax=ax
+        )
+    else:
+        # Sampled strip on top
+        sns.stripplot(
+            x="Instrument Status",
+            y="Nominal Amount",
+            data=subset.sample(max_swarm_points, random_state=0),
+            size=2,
+            alpha=0.3,
+            jitter=0.3,
+            color="dimgray",
+            ax=ax
+        )
+    ax.set_title(f"{label} – Instrument Status vs. Nominal Amount")
+    ax.set_xlabel("Instrument Status")
+    ax.set_ylabel("Nominal Amount (ZAR)")
+    ax.tick_params(axis="x", rotation=30)
+
+    # Force plain style numeric formatting on Y-axis
+    ax.ticklabel_format(style="plain", axis="y", useOffset=False)
+    return fig
+
+
+# Dashboard chart sections, in display order.
+BOND_CHARTS = {
+    "Maturity vs. Nominal": {
+        "title": "1) Maturity Year vs. Nominal Amount (Beeswarm)",
+        "columns": {"Maturity Date Year", "Nominal Amount"},
+        "empty_message": "No valid rows after dropping missing Maturity/ Nominal data.",
+        "large_mode": "hexbin density instead of a beeswarm",
+        "plot": plot_maturity_vs_nominal,
+    },
+    "Issue Date vs. Nominal": {
+        "title": "2) Issue Date vs. Nominal Amount (Scatter)",
+        "columns": {"Issue Date", "Nominal Amount"},
+        "empty_message": "No valid rows after dropping missing Issue Date/ Nominal data.",
+        "large_mode": None,
+        "plot": lambda subset, label, max_swarm_points: plot_issue_date_vs_nominal(subset, label),
+    },
+    "Status vs. Nominal": {
+        "title": "3) Instrument Status vs. Nominal Amount (Violin + Swarm)",
+        "columns": {"Instrument Status", "Nominal Amount"},
+        "empty_message": "No valid rows after dropping missing Instrument Status/ Nominal data.",
+        "large_mode": "a sampled strip plot instead of a swarm",
+        "plot": plot_status_vs_nominal,
+    },
+}
+
+
+def pick_issuers(df, default_query="inguza"):
+    """
+    Issuer picker backed by the dataset's IssuerIndex: a substring search box
+    plus a multiselect of the matching issuers.
+    Returns (filtered DataFrame, display label, selected issuers), or
+    (None, None, None) if nothing is selected.
+    """
+    index = get_issuer_index(df.attrs.get("dataset_key", id(df)), df["Issuer Name"])
+
+    query = st.text_input("Search issuers", value=default_query, key="bond_issuer_query")
+    matches = index.search(query)
+    if not matches:
+        st.warning(f"No data found where Issuer Name contains '{query}'. Check your dataset.")
+        return None, None, None
+
+    selected = st.multiselect(
+        f"Issuers matching '{query}' ({len(matches):,})",
+        options=matches,
+        default=matches if len(matches) <= 20 else matches[:1],
+        key=f"bond_issuers_{query}",
+    )
+    if not selected:
+        st.info("Select at least one issuer to analyse.")
+        return None, None, None
+
+    df_selected = df.iloc[index.rows(selected)].copy()
+    # Drop category levels that only other issuers use, so plots don't show empty slots
+    for col in df_selected.select_dtypes("category").columns:
+        df_selected[col] = df_selected[col].cat.remove_unused_categories()
+
+    label = selected[0] if len(selected) == 1 else (query.strip().title() or "Selected Issuers")
+    return df_selected, label, tuple(selected)
+
+
+def show_issuer_comparison(df):
+    """
+    Side-by-side comparison of many issuers. All per-issuer aggregates are
+    computed once per dataset (see utils.bond_aggregates), so changing the
+    selection only slices precomputed tables.
+    """
+    st.subheader("Multi-Issuer Comparison")
+    aggregates = get_issuer_aggregates(df.attrs.get("dataset_key", id(df)), df)
+    summary = aggregates["summary"]
+
+    rank_col = "Total Nominal" if "Total Nominal" in summary.columns else "Bonds"
+    ranked = [str(name) for name in summary.sort_values(rank_col, ascending=False).index]
+    selected = st.multiselect(
+        f"Issuers to compare ({len(ranked):,} available, ranked by {rank_col.lower()})",
+        options=ranked,
+        default=ranked[:5],
+        key="bond_compare_issuers",
+    )
+    if not selected:
+        st.info("Select at least one issuer to compare.")
+        return
+
+    tables = select_issuers(aggregates, selected)
+    st.dataframe(tables["summary"], use_container_width=True)
 
-    # -------------------------------------------------------------------------
-    # TAB 1: Maturity Year vs. Nominal (Beeswarm)
-    # -------------------------------------------------------------------------
+    tab1, tab2, tab3 = st.tabs(["Nominal by Maturity Year", "Issuance by Month", "Status Mix"])
     with tab1:
-        st.subheader("1) Maturity Year vs. Nominal Amount (Beeswarm)")
-        needed_cols = {"Maturity Date Year", "Nominal Amount"}
-        if not needed_cols.issubset(df_inguza.columns):
-            st.warning(f"Missing columns for this plot: {needed_cols}.")
+        if "nominal_by_maturity" in tables:
+            by_year = tables["nominal_by_maturity"].T
+            by_year.index = by_year.index.astype(str)
+            st.bar_chart(by_year)
         else:
-            subset = df_inguza.dropna(subset=needed_cols)
-            if subset.empty:
-                st.info("No valid rows after dropping missing Maturity/ Nominal data.")
-            else:
-                # Convert Maturity Date Year to string/categorical for beeswarm
-                subset["Maturity Date Year"] = subset["Maturity Date Year"].astype(int).astype(str)
-
-                fig, ax = plt.subplots(figsize=(8, 5))
-                sns.swarmplot(
-                    x="Maturity Date Year",
-                    y="Nominal Amount",
-                    data=subset,
-                    color="dodgerblue",
-                    size=5,
-                    ax=ax
-                )
-                ax.set_title("Inguza – Maturity Year vs. Nominal Amount")
-                ax.set_xlabel("Maturity Year")
-                ax.set_ylabel("Nominal Amount (ZAR)")
-                plt.xticks(rotation=45)
-
-                # Force plain style numeric formatting on Y-axis
-                ax.ticklabel_format(style="plain", axis="y", useOffset=False)
-
-                st.pyplot(fig)
-
-    # -------------------------------------------------------------------------
-    # TAB 2: Issue Date vs. Nominal (Scatter)
-    # -------------------------------------------------------------------------
+            st.warning("Missing 'Maturity Date Year' or 'Nominal Amount' columns for this view.")
     with tab2:
-        st.subheader("2) Issue Date vs. Nominal Amount (Scatter)")
-        needed_cols = {"Issue Date", "Nominal Amount"}
-        if not needed_cols.issubset(df_inguza.columns):
-            st.warning(f"Missing columns for this plot: {needed_cols}.")
+        if "issuance_by_month" in tables:
+            st.line_chart(tables["issuance_by_month"].T)
         else:
-            subset = df_inguza.dropna(subset=needed_cols)
-            if subset.empty:
-                st.info("No valid rows after dropping missing Issue Date/ Nominal data.")
-            else:
-                fig, ax = plt.subplots(figsize=(8, 5))
-                ax.scatter(
-                    subset["Issue Date"],
-                    subset["Nominal Amount"],
-                    color="darkred",
-                    alpha=0.6,
-                    s=40
-                )
-                ax.set_title("Inguza – Issue Date vs. Nominal Amount")
-                ax.set_xlabel("Issue Date")
-                ax.set_ylabel("Nominal Amount (ZAR)")
-                plt.xticks(rotation=30)
-
-                # Force plain style numeric formatting on Y-axis
-                ax.ticklabel_format(style="plain", axis="y", useOffset=False)
-
-                st.pyplot(fig)
-
-    # -------------------------------------------------------------------------
-    # TAB 3: Instrument Status vs. Nominal (Violin+Swarm)
-    # -------------------------------------------------------------------------
+            st.warning("Missing 'Issue Date' or 'Nominal Amount' columns for this view.")
     with tab3:
-        st.subheader("3) Instrument Status vs. Nominal Amount (Violin + Swarm)")
-        needed_cols = {"Instrument Status", "Nominal Amount"}
-        if not needed_cols.issubset(df_inguza.columns):
-            st.warning(f"Missing columns for this plot: {needed_cols}.")
+        if "status_mix" in tables:
+            mix = tables["status_mix"]
+            st.bar_chart(mix.div(mix.sum(axis=1), axis=0))
+            st.caption("Share of each issuer's bonds by instrument status.")
         else:
-            subset = df_inguza.dropna(subset=needed_cols)
-            if subset.empty:
-                st.info("No valid rows after dropping missing Instrument Status/ Nominal data.")
-            else:
-                fig, ax = plt.subplots(figsize=(8, 5))
-                # Violin plot
-                sns.violinplot(
-                    x="Instrument Status",
-                    y="Nominal Amount",
-                    data=subset,
-                    inner=None,
-                    color="lightgray",
-                    cut=0,
-                    ax=ax
-                )
-                # Swarm on top
-                sns.swarmplot(
-                    x="Instrument Status",
-                    y="Nominal Amount",
-                    data=subset,
-                    size=4,
-                    edgecolor="gray",
-                    linewidth=0.5,
-                    ax=ax
-                )
-                ax.set_title("Inguza – Instrument Status vs. Nominal Amount")
-                ax.set_xlabel("Instrument Status")
-                ax.set_ylabel("Nominal Amount (ZAR)")
-                plt.xticks(rotation=30)
-
-                # Force plain style numeric formatting on Y-axis
-                ax.ticklabel_format(style="plain", axis="y", useOffset=False)
-
-                st.pyplot(fig)
-
-    st.success("Inguza Bond Analysis complete!")
+            st.warning("Missing 'Instrument Status' column for this view.")
@@ -0,0 +1,235 @@
+# workflows/rcf_batch.py
+
+import tempfile
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import streamlit as st
+from openpyxl import load_workbook
+
+from utils.table_render import display_paged_table
+from workflows.rcf_pricer import FACILITY_FIELDS, RCFPricer
+
+# Facilities priced per chunk; memory use is bounded by this, not the file size.
+BATCH_CHUNK_ROWS = 50_000
+
+# Rows of the priced portfolio kept in the session for browsing; the full
+# results stay in the spooled file and are only read for the download.
+BATCH_PREVIEW_ROWS = 10_000
+
+# Line items written to the results file next to each facility's inputs.
+RESULT_COLUMNS = (
+    "drawn_amount",
+    "undrawn_amount",
+    "net_spread_zar",
+    "net_commit_fee_zar",
+    "blended_netrev_zar",
+    "roc_bps",
+    "cln_percentage",
+    "cln_net_spread_zar",
+    "cln_cost_zar",
+    "cln_blended_netrev_zar",
+    "cln_roc_bps",
+)
+
+
+def iter_facility_chunks(file, chunksize=BATCH_CHUNK_ROWS):
+    """
+    Yields DataFrames of at most `chunksize` rows from a CSV, XLSX or Parquet
+    facility file (local path or user upload), without loading it whole.
+    """
+    name = file if isinstance(file, str) else file.name
+    if not isinstance(file, str):
+        file.seek(0)
+
+    if name.endswith(".csv"):
+        yield from pd.read_csv(file, chunksize=chunksize)
+    elif name.endswith(".parquet"):
+        for batch in pq.ParquetFile(file).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    elif name.endswith(".xlsx"):
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(col) for col in next(rows, ())]
+            block = []
+            for row in rows:
+                block.append(row)
+                if len(block) == chunksize:
+                    yield pd.DataFrame(block, columns=header)
+                    block = []
+            if block:
+                yield pd.DataFrame(block, columns=header)
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(f"Unsupported facility file type: {name}")
+
+
+def price_chunk(chunk, defaults, pricer=None):
+    """
+    Prices every facility in a chunk. Columns named after FACILITY_FIELDS are
+    used where present; absent columns take the value from `defaults`.
+    Non-numeric cells make that facility's results NaN.
+    Returns the inputs and all line items, one row per facility (cln_amount
+    is the CLN amount after capping at the limit).
+    """
+    pricer = pricer or RCFPricer()
+    inputs = {}
+    for field in FACILITY_FIELDS:
+        if field in chunk.columns:
+            inputs[field] = pd.to_numeric(chunk[field], errors="coerce").to_numpy(dtype=np.float64)
+        else:
+            inputs[field] = np.full(len(chunk), defaults[field], dtype=np.float64)
+
+    results = pricer.price(**inputs)
+    company = chunk["company_name"].astype(str) if "company_name" in chunk.columns else chunk.index.astype(str)
+    return pd.DataFrame({"company_name": np.asarray(company), **inputs, **results})
+
+
+def price_portfolio(file, defaults, out, chunksize=BATCH_CHUNK_ROWS):
+    """
+    Prices a whole facility file chunk by chunk, writing the per-facility
+    results as CSV to the file object `out`, and returns portfolio totals.
+
+    Portfolio ROC is the capital-weighted average of the facilities' own
+    roc_bps / cln_roc_bps (weighted by |drawn capital| and |blended CLN
+    capital|, the capital each of those is measured against), so a
+    one-facility portfolio reports that facility's ROC. Facilities with
+    invalid inputs are counted but left out of the totals.
+    """
+    pricer = RCFPricer()
+    totals = {
+        "facilities": 0,
+        "invalid_facilities": 0,
+        "rcf_limit": 0.0,
+        "drawn_amount": 0.0,
+        "blended_netrev_zar": 0.0,
+        "cln_amount": 0.0,
+        "cln_blended_netrev_zar": 0.0,
+    }
+    roc = {"": [0.0, 0.0], "cln_": [0.0, 0.0]}
+
+    columns = ["company_name", *FACILITY_FIELDS, *RESULT_COLUMNS]
+    writer = None
+    for chunk in iter_facility_chunks(file, chunksize):
+        priced = price_chunk(chunk, defaults, pricer)
+        table = pa.Table.from_pandas(priced[columns], preserve_index=False)
+        if writer is None:
+            schema = table.schema
+            writer = pacsv.CSVWriter(out, schema)
+        writer.write_table(table.cast(schema))
+
+        valid = priced[list(FACILITY_FIELDS)].notna().all(axis=1).to_numpy()
+        totals["facilities"] += len(priced)
+        totals["invalid_facilities"] += int((~valid).sum())
+        ok = priced[valid]
+        for key in ("rcf_limit", "drawn_amount", "blended_netrev_zar", "cln_amount", "cln_blended_netrev_zar"):
+            totals[key] += float(ok[key].sum())
+        for prefix, weight_column in (("", "capital_zar"), ("cln_", "cln_blended_capital_zar")):
+            weight = ok[weight_column].abs()
+            roc[prefix][0] += float((ok[f"{prefix}roc_bps"] * weight).sum())
+            roc[prefix][1] += float(weight.sum())
+
+    if writer is not None:
+        writer.close()
+    totals["roc_bps"] = roc[""][0] / roc[""][1] if roc[""][1] else 0.0
+    totals["cln_roc_bps"] = roc["cln_"][0] / roc["cln_"][1] if roc["cln_"][1] else 0.0
+    return totals
+
+
+def read_results_preview(results, max_rows=BATCH_PREVIEW_ROWS):
+    """The first `max_rows` rows of a results CSV, read block by block rather than whole."""
+    results.seek(0)
+    reader = pacsv.open_csv(results)
+    batches, rows = [], 0
+    for batch in reader:
+        batches.append(batch.slice(0, max_rows - rows))
+        rows += batches[-1].num_rows
+        if rows >= max_rows:
+            break
+    return pa.Table.from_batches(batches, schema=reader.schema).to_pandas()
+
+
+def facility_template(defaults):
+    """A one-row example facility file containing every supported column."""
+    return pd.DataFrame([{"company_name": "Example Co", **{f: defaults[f] for f in FACILITY_FIELDS}}])
+
+
+def display_rcf_batch(defaults):
+    """
+    Batch portfolio mode for the RCF – CLN Calculator: prices every facility
+    in an uploaded file and offers the results file plus portfolio totals.
+    The sidebar inputs act as defaults for columns missing from the file.
+    """
+    st.subheader("Batch Portfolio Pricing")
+    st.write(
+        "Upload a CSV, XLSX or Parquet file with one facility per row. Supported columns: "
+        f"`company_name`, {', '.join(f'`{f}`' for f in FACILITY_FIELDS)}. "
+        "Columns you leave out use the sidebar values."
+    )
+    st.download_button(
+        label="Download Template CSV",
+        data=facility_template(defaults).to_csv(index=False).encode('utf-8'),
+        file_name="rcf_facilities_template.csv",
+        mime='text/csv'
+    )
+
+    facility_file = st.file_uploader("Upload facilities", type=["csv", "xlsx", "parquet"], key="rcf_batch_file")
+    if not facility_file:
+        st.info("Upload a facility file to price the portfolio.")
+        return
+
+    # The last priced portfolio is kept in the session, so browsing its
+    # results (paging, sorting) does not require pricing it again
+    batch_key = (facility_file.file_id, tuple(defaults[f] for f in FACILITY_FIELDS))
+    if st.button("Price Portfolio"):
+        # Results are spooled to disk once they outgrow memory
+        results = tempfile.SpooledTemporaryFile(max_size=32 * 1024 * 1024, mode="w+b")
+        with st.spinner("Pricing portfolio..."):
+            try:
+                totals = price_portfolio(facility_file, defaults, results)
+                frame = read_results_preview(results) if totals["facilities"] else pd.DataFrame()
+            except Exception as e:
+                st.error(f"Could not price the facility file: {e}")
+                return
+        st.session_state.rcf_batch_result = {"key": batch_key, "totals": totals, "file": results, "frame": frame}
+
+    stored = st.session_state.get("rcf_batch_result")
+    if stored is None or stored["key"] != batch_key:
+        return
+    totals = stored["totals"]
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Facilities", f"{totals['facilities']:,}")
+    col2.metric("Net Revenue (No CLN)", f"{totals['blended_netrev_zar']:,.0f}")
+    col3.metric("Net Revenue (CLN)", f"{totals['cln_blended_netrev_zar']:,.0f}")
+    col1.metric("Total Limit", f"{totals['rcf_limit']:,.0f}")
+    col2.metric("Portfolio ROC (No CLN)", f"{totals['roc_bps']:,.2f}")
+    col3.metric("Portfolio ROC (CLN)", f"{totals['cln_roc_bps']:,.2f}")
+    if totals["invalid_facilities"]:
+        st.warning(f"{totals['invalid_facilities']:,} facilities had non-numeric inputs and were left out of the totals.")
+
+    if len(stored["frame"]) < totals["facilities"]:
+        st.caption(f"Browsing the first {len(stored['frame']):,} of {totals['facilities']:,} facilities; "
+                   "download the results CSV for all of them.")
+    if len(stored["frame"]):
+        display_paged_table(stored["frame"], key="rcf_batch_rows", data_key=batch_key, file_name="rcf_portfolio_view")
+    st.download_button(
+        label="Download Portfolio Results CSV",
+        data=partial(_read_results, stored["file"]),
+        file_name="rcf_portfolio_results.csv",
+        mime='text/csv',
+        on_click="ignore",
+    )
+    st.success("Portfolio pricing complete!")
+
+
+def _read_results(results):
+    """Contents of a spooled results file (for deferred downloads)."""
+    results.seek(0)
+    return results.read()
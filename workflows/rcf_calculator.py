@@ -1,12 +1,18 @@
 # workflows/rcf_calculator.py
 import streamlit as st
 import pandas as pd
-from utils.helpers import display_table, format_negatives
+from utils.table_render import display_rendered_table, render_table
+from workflows.rcf_pricer import FACILITY_FIELDS, RCFPricer, facility_line_items
+from workflows.rcf_batch import display_rcf_batch
+from workflows.rcf_compare import display_rcf_comparison
+from workflows.rcf_sensitivity import display_rcf_sensitivity
 
 def display_rcf_calculator():
     """
     Enhanced RCF – CLN Calculator with advanced styling, negative formatting,
     image downloads, and optional CLN scenario comparison.
+    A batch mode prices a whole uploaded portfolio of facilities, and a
+    sensitivity mode sweeps drawn % and CLN size across a grid.
     """
 
     # Optionally remove this if your main app sets page config
@@ -21,6 +27,7 @@ def display_rcf_calculator():
 
     # Sidebar
     st.sidebar.header("RCF – CLN Inputs")
+    pricing_mode = st.sidebar.radio("Pricing Mode", ["Single Facility", "Batch Portfolio", "Sensitivity Grid"])
     company_name = st.sidebar.text_input("Company Name", value="Burger's Burgers")
     rcf_limit = st.sidebar.number_input("RCF Limit (ZAR)", min_value=0.0, value=2_000_000_000.0, step=50_000.0)
     drawn_percentage = st.sidebar.number_input("Drawn % (0-1)", min_value=0.0, max_value=1.0, value=0.35, step=0.05)
@@ -52,94 +59,54 @@ def display_rcf_calculator():
         compare_mode = st.sidebar.radio("CLN Output Display",
                                         ["Show CLN Table Only", "Compare: No CLN vs. CLN", "Single Comparison Table"])
 
-    # Calculate button
-    calc_btn = st.button("Calculate")
-    if not calc_btn:
+    inputs = {
+        "rcf_limit": rcf_limit,
+        "drawn_percentage": drawn_percentage,
+        "cap_cost": cap_cost,
+        "margin_bps": margin_bps,
+        "funding_bps": funding_bps,
+        "credit_bps": credit_bps,
+        "capital_bps": capital_bps,
+        "commitment_fee_bps": commitment_fee_bps,
+        "commitment_fee_funding_bps": commitment_fee_funding_bps,
+        "commitment_fee_credit_bps": commitment_fee_credit_bps,
+        "commitment_fee_capital_bps": commitment_fee_capital_bps,
+        "cln_amount": cln_amount,
+        "cln_cost_bps": cln_cost_bps,
+    }
+
+    # Batch mode prices a whole uploaded portfolio, using the sidebar as defaults
+    if pricing_mode == "Batch Portfolio":
+        display_rcf_batch(inputs)
+        return
+    # Sensitivity mode sweeps drawn % / CLN amount around the sidebar facility
+    if pricing_mode == "Sensitivity Grid":
+        display_rcf_sensitivity(inputs)
+        return
+
+    # Calculate button. The last calculated inputs are remembered, so reruns
+    # that only change the display (e.g. the compare-mode radio) keep results.
+    calc_key = (company_name, tuple(float(inputs[field]) for field in FACILITY_FIELDS))
+    if st.button("Calculate"):
+        st.session_state.rcf_calculated_key = calc_key
+    if st.session_state.get("rcf_calculated_key") != calc_key:
         st.info("Enter your inputs on the sidebar and click 'Calculate' to see results.")
         return
 
-    # Actual calculations
+    # Actual calculations (vectorized engine, memoized per input vector)
     with st.spinner("Calculating..."):
-        # Basic derived values
-        drawn_amount = rcf_limit * drawn_percentage
-        undrawn_amount = rcf_limit - drawn_amount
-
-        # 1) Drawn margin
-        margin_zar = drawn_amount * (margin_bps / 10000)
-        # 2) Funding, credit, capital
-        funding_zar = drawn_amount * (funding_bps / 10000)
-        credit_zar = drawn_amount * (credit_bps / 10000)
-        capital_zar = drawn_amount * (capital_bps / 10000)
-        total_cost_bps = funding_bps + credit_bps + capital_bps
-        total_cost_zar = funding_zar + credit_zar + capital_zar
-        net_spread_zar = margin_zar + total_cost_zar
-        net_spread_bps = margin_bps + total_cost_bps
-
-        # Undrawn
-        commitment_fee_zar = undrawn_amount * (commitment_fee_bps / 10000)
-        comm_fee_funding_zar = undrawn_amount * (commitment_fee_funding_bps / 10000)
-        comm_fee_credit_zar = undrawn_amount * (commitment_fee_credit_bps / 10000)
-        comm_fee_capital_zar = undrawn_amount * (commitment_fee_capital_bps / 10000)
-        net_commit_fee_bps = commitment_fee_bps + commitment_fee_funding_bps + commitment_fee_credit_bps + commitment_fee_capital_bps
-        net_commit_fee_zar = undrawn_amount * (net_commit_fee_bps / 10000)
-
-        # Blended
-        blended_view_margin_zar = margin_zar + commitment_fee_zar
-        blended_view_funding_zar = funding_zar + comm_fee_funding_zar
-        blended_view_credit_zar = credit_zar + comm_fee_credit_zar
-        blended_view_capital_zar = capital_zar + comm_fee_capital_zar
-        blended_view_netrev_zar = blended_view_margin_zar + blended_view_funding_zar + blended_view_credit_zar + blended_view_capital_zar
-
-        # If capital is negative, we can do a return on capital
-        try:
-            # e.g. approximate
-            if blended_view_capital_bps := (capital_bps * drawn_percentage + commitment_fee_capital_bps * (1 - drawn_percentage)) == 0:
-                blended_roc_bps = 0
-            else:
-                # e.g. a simplistic approach
-                blended_roc_bps = ((margin_bps + funding_bps + credit_bps) / -capital_bps) * cap_cost
-        except:
-            blended_roc_bps = 0
-
-        # Build a "No CLN" table
-        no_cln_rows = [
-            {"Item": f"<b>{company_name}</b>", "ZAR": "", "BPS": ""},
-            {"Item": "<b>Margin</b>", "ZAR": margin_zar, "BPS": margin_bps},
-            {"Item": "<b>Total Cost</b>", "ZAR": total_cost_zar, "BPS": total_cost_bps},
-            {"Item": "Funding", "ZAR": funding_zar, "BPS": funding_bps},
-            {"Item": "Credit", "ZAR": credit_zar, "BPS": credit_bps},
-            {"Item": "Capital", "ZAR": capital_zar, "BPS": capital_bps},
-            {"Item": "<b>Net Spread</b>", "ZAR": net_spread_zar, "BPS": net_spread_bps},
-            {"Item": "", "ZAR": "", "BPS": ""},
-            {"Item": "<b>Commitment Fee</b>", "ZAR": commitment_fee_zar, "BPS": commitment_fee_bps},
-            {"Item": "Funding", "ZAR": comm_fee_funding_zar, "BPS": commitment_fee_funding_bps},
-            {"Item": "Credit", "ZAR": comm_fee_credit_zar, "BPS": commitment_fee_credit_bps},
-            {"Item": "Capital", "ZAR": comm_fee_capital_zar, "BPS": commitment_fee_capital_bps},
-            {"Item": "<b>Net Spread</b>", "ZAR": net_commit_fee_zar, "BPS": net_commit_fee_bps},
-            {"Item": "", "ZAR": "", "BPS": ""},
-            {"Item": "<b>Blended View</b>", "ZAR": "", "BPS": ""},
-            {"Item": "Margin", "ZAR": blended_view_margin_zar, "BPS": margin_bps},
-            {"Item": "Funding", "ZAR": blended_view_funding_zar, "BPS": funding_bps},
-            {"Item": "Credit", "ZAR": blended_view_credit_zar, "BPS": credit_bps},
-            {"Item": "Capital", "ZAR": blended_view_capital_zar, "BPS": capital_bps},
-            {"Item": "<b>Net Revenue</b>", "ZAR": blended_view_netrev_zar, "BPS": ""},
-            {"Item": "<b>ROC (approx)</b>", "ZAR": "", "BPS": blended_roc_bps},
-            {"Item": "", "ZAR": "", "BPS": ""},
-            {"Item": "<b>Facility Amount</b>", "ZAR": rcf_limit, "BPS": "100%"},
-            {"Item": "<b>Drawn</b>", "ZAR": drawn_amount, "BPS": f"{drawn_percentage*100:.0f}%"},
-            {"Item": "<b>Undrawn</b>", "ZAR": undrawn_amount, "BPS": f"{(1-drawn_percentage)*100:.0f}%"},
-        ]
+        result = calculate_rcf(*calc_key)
+    no_cln, cln = result["no_cln"], result["cln"]
 
     # Display the "No CLN" table
     st.subheader("No CLN Scenario")
     st.download_button(
         label="Download No CLN CSV",
-        data=pd.DataFrame(no_cln_rows).to_csv(index=False).encode('utf-8'),
+        data=no_cln["csv"],
         file_name=f"{company_name}_no_cln.csv",
         mime='text/csv'
     )
-    df_no_cln = pd.DataFrame(no_cln_rows)
-    display_table(df_no_cln)
+    display_rendered_table(no_cln["table"], key="rcf_no_cln", file_name=f"{company_name}_no_cln")
 
     # If no CLN, we’re done
     if not include_cln:
@@ -147,129 +114,124 @@ def display_rcf_calculator():
         return
 
     # If we do have CLN
-    # 1) Make sure cln_amount <= rcf_limit
-    cln_amount = min(cln_amount, rcf_limit)
-    cln_percentage = cln_amount / rcf_limit
-
-    # 2) Recompute the cost scaling for CLN
-    # margin stays the same
-    cln_margin_zar = margin_zar
-
-    # funding stays the same
-    cln_funding_zar = funding_zar
-    # scale credit and capital by (1 - cln_percentage)
-    cln_credit_zar = drawn_amount * (credit_bps * (1 - cln_percentage) / 10000)
-    cln_capital_zar = drawn_amount * (capital_bps * (1 - cln_percentage) / 10000)
-    cln_total_cost_zar = cln_funding_zar + cln_credit_zar + cln_capital_zar
-    cln_net_spread_zar = cln_margin_zar + cln_total_cost_zar
-    cln_net_spread_bps = margin_bps + (funding_bps + credit_bps*(1 - cln_percentage) + capital_bps*(1 - cln_percentage))
-
-    # CLN cost
-    cln_specific_cost_zar = cln_amount * (cln_cost_bps / 10000)
-
-    # Commitment fees
-    cln_commitment_fee_zar = undrawn_amount * (commitment_fee_bps / 10000)
-    cln_commit_funding_zar = undrawn_amount * (commitment_fee_funding_bps / 10000)
-    cln_commit_credit_zar = undrawn_amount * (commitment_fee_credit_bps * (1 - cln_percentage) / 10000)
-    cln_commit_capital_zar = undrawn_amount * (commitment_fee_capital_bps * (1 - cln_percentage) / 10000)
-    cln_commit_net_bps = (commitment_fee_bps + commitment_fee_funding_bps +
-                          commitment_fee_credit_bps*(1 - cln_percentage) +
-                          commitment_fee_capital_bps*(1 - cln_percentage))
-    cln_commit_net_zar = undrawn_amount * (cln_commit_net_bps / 10000)
-
-    # Blended
-    cln_blended_margin_zar = cln_margin_zar + cln_commitment_fee_zar
-    cln_blended_funding_zar = cln_funding_zar + cln_commit_funding_zar
-    cln_blended_credit_zar = cln_credit_zar + cln_commit_credit_zar
-    cln_blended_capital_zar = cln_capital_zar + cln_commit_capital_zar
-    cln_blended_netrev_zar = (cln_blended_margin_zar +
-                              cln_blended_funding_zar +
-                              cln_blended_credit_zar +
-                              cln_blended_capital_zar +
-                              cln_specific_cost_zar)  # CLN cost is negative
-
-    # Approx ROC
-    try:
-        if cln_blended_capital_zar != 0:
-            # e.g. do a ratio
-            cln_roc_bps = ((cln_blended_margin_zar + cln_blended_funding_zar + cln_blended_credit_zar)
-                           / abs(cln_blended_capital_zar) * cap_cost)
-        else:
-            cln_roc_bps = 0
-    except:
-        cln_roc_bps = 0
-
-    # Build table
-    cln_rows = [
-        {"Item": f"<b>CLN Scenario</b>", "ZAR": "", "BPS": ""},
-        {"Item": "CLN Amount", "ZAR": cln_amount, "BPS": f"{cln_percentage*100:.0f}%"},
-        {"Item": "<b>Margin</b>", "ZAR": cln_margin_zar, "BPS": margin_bps},
-        {"Item": "<b>Total Cost</b>", "ZAR": cln_total_cost_zar, "BPS": ""},
-        {"Item": "Funding", "ZAR": cln_funding_zar, "BPS": funding_bps},
-        {"Item": "Credit", "ZAR": cln_credit_zar, "BPS": credit_bps*(1 - cln_percentage)},
-        {"Item": "Capital", "ZAR": cln_capital_zar, "BPS": capital_bps*(1 - cln_percentage)},
-        {"Item": "<b>Net Spread</b>", "ZAR": cln_net_spread_zar, "BPS": cln_net_spread_bps},
-        {"Item": "", "ZAR": "", "BPS": ""},
-        {"Item": "CLN Cost", "ZAR": cln_specific_cost_zar, "BPS": cln_cost_bps},
-        {"Item": "", "ZAR": "", "BPS": ""},
-        {"Item": "<b>Commitment Fee</b>", "ZAR": cln_commitment_fee_zar, "BPS": commitment_fee_bps},
-        {"Item": "Funding", "ZAR": cln_commit_funding_zar, "BPS": commitment_fee_funding_bps},
-        {"Item": "Credit", "ZAR": cln_commit_credit_zar, "BPS": commitment_fee_credit_bps*(1 - cln_percentage)},
-        {"Item": "Capital", "ZAR": cln_commit_capital_zar, "BPS": commitment_fee_capital_bps*(1 - cln_percentage)},
-        {"Item": "<b>Net Spread</b>", "ZAR": cln_commit_net_zar, "BPS": cln_commit_net_bps},
-        {"Item": "", "ZAR": "", "BPS": ""},
-        {"Item": "<b>Blended View</b>", "ZAR": "", "BPS": ""},
-        {"Item": "Margin", "ZAR": cln_blended_margin_zar, "BPS": ""},
-        {"Item": "Funding", "ZAR": cln_blended_funding_zar, "BPS": ""},
-        {"Item": "Credit", "ZAR": cln_blended_credit_zar, "BPS": ""},
-        {"Item": "Capital", "ZAR": cln_blended_capital_zar, "BPS": ""},
-        {"Item": "CLN Cost", "ZAR": cln_specific_cost_zar, "BPS": cln_cost_bps},
-        {"Item": "<b>Net Revenue</b>", "ZAR": cln_blended_netrev_zar, "BPS": ""},
-        {"Item": "<b>ROC (approx)</b>", "ZAR": "", "BPS": cln_roc_bps},
-        {"Item": "", "ZAR": "", "BPS": ""},
-        {"Item": "<b>Facility Amount</b>", "ZAR": rcf_limit, "BPS": "100%"},
-        {"Item": "<b>Drawn</b>", "ZAR": drawn_amount, "BPS": f"{drawn_percentage*100:.0f}%"},
-        {"Item": "<b>Undrawn</b>", "ZAR": undrawn_amount, "BPS": f"{(1-drawn_percentage)*100:.0f}%"},
-    ]
-
     if compare_mode == "Show CLN Table Only":
         st.subheader("CLN Scenario Only")
         st.download_button(
             label="Download CLN CSV",
-            data=pd.DataFrame(cln_rows).to_csv(index=False).encode('utf-8'),
+            data=cln["csv"],
             file_name=f"{company_name}_cln.csv",
             mime='text/csv'
         )
-        df_cln = pd.DataFrame(cln_rows)
-        display_table(df_cln)
+        display_rendered_table(cln["table"], key="rcf_cln", file_name=f"{company_name}_cln")
     elif compare_mode == "Compare: No CLN vs. CLN":
         col1, col2 = st.columns(2)
         with col1:
             st.subheader("No CLN Scenario")
-            df_no_cln = pd.DataFrame(no_cln_rows)
             st.download_button(
                 label="No CLN CSV",
-                data=df_no_cln.to_csv(index=False).encode('utf-8'),
+                data=no_cln["csv"],
                 file_name=f"{company_name}_no_cln.csv"
             )
-            display_table(df_no_cln)
+            display_rendered_table(no_cln["table"], key="rcf_compare_no_cln", file_name=f"{company_name}_no_cln")
         with col2:
             st.subheader("CLN Scenario")
-            df_cln = pd.DataFrame(cln_rows)
             st.download_button(
                 label="CLN CSV",
-                data=df_cln.to_csv(index=False).encode('utf-8'),
+                data=cln["csv"],
                 file_name=f"{company_name}_cln.csv"
             )
-            display_table(df_cln)
+            display_rendered_table(cln["table"], key="rcf_compare_cln", file_name=f"{company_name}_cln")
     else:
-        # Single Comparison Table
-        st.subheader("Single Comparison Table (No CLN vs. CLN)")
-        # Build a quick merged table if desired ...
-        # For brevity, we can just show the CLN table.
-        # But you can adapt the snippet to do side-by-side in one DataFrame
-        st.info("Merging into one table is left as an exercise. Currently showing only CLN table.")
-        df_cln = pd.DataFrame(cln_rows)
-        display_table(df_cln)
+        # Single Comparison Table (plus any structuring alternatives)
+        display_rcf_comparison(company_name, inputs)
 
     st.success("Calculation complete!")
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def calculate_rcf(company_name, input_values):
+    """
+    Prices one facility and prepares everything the result views need:
+    line items plus, per scenario, the table rows, rendered table and CSV
+    bytes. Memoized on (company_name, input values in FACILITY_FIELDS order).
+    """
+    inputs = dict(zip(FACILITY_FIELDS, input_values))
+    r = facility_line_items(RCFPricer().price(**inputs))
+    result = {"line_items": r}
+    for scenario, rows in (("no_cln", build_no_cln_rows(company_name, inputs, r)),
+                           ("cln", build_cln_rows(inputs, r))):
+        df = pd.DataFrame(rows)
+        csv = df.to_csv(index=False).encode('utf-8')
+        result[scenario] = {"rows": rows, "csv": csv, "table": render_table(df)}
+    return result
+
+
+def build_no_cln_rows(company_name, inputs, r):
+    """
+    Rows of the "No CLN" table for one facility, from its inputs and its
+    line items (facility_line_items of an RCFPricer result).
+    """
+    drawn_percentage = inputs["drawn_percentage"]
+    return [
+        {"Item": f"<b>{company_name}</b>", "ZAR": "", "BPS": ""},
+        {"Item": "<b>Margin</b>", "ZAR": r["margin_zar"], "BPS": inputs["margin_bps"]},
+        {"Item": "<b>Total Cost</b>", "ZAR": r["total_cost_zar"], "BPS": r["total_cost_bps"]},
+        {"Item": "Funding", "ZAR": r["funding_zar"], "BPS": inputs["funding_bps"]},
+        {"Item": "Credit", "ZAR": r["credit_zar"], "BPS": inputs["credit_bps"]},
+        {"Item": "Capital", "ZAR": r["capital_zar"], "BPS": inputs["capital_bps"]},
+        {"Item": "<b>Net Spread</b>", "ZAR": r["net_spread_zar"], "BPS": r["net_spread_bps"]},
+        {"Item": "", "ZAR": "", "BPS": ""},
+        {"Item": "<b>Commitment Fee</b>", "ZAR": r["commitment_fee_zar"], "BPS": inputs["commitment_fee_bps"]},
+        {"Item": "Funding", "ZAR": r["comm_fee_funding_zar"], "BPS": inputs["commitment_fee_funding_bps"]},
+        {"Item": "Credit", "ZAR": r["comm_fee_credit_zar"], "BPS": inputs["commitment_fee_credit_bps"]},
+        {"Item": "Capital", "ZAR": r["comm_fee_capital_zar"], "BPS": inputs["commitment_fee_capital_bps"]},
+        {"Item": "<b>Net Spread</b>", "ZAR": r["net_commit_fee_zar"], "BPS": r["net_commit_fee_bps"]},
+        {"Item": "", "ZAR": "", "BPS": ""},
+        {"Item": "<b>Blended View</b>", "ZAR": "", "BPS": ""},
+        {"Item": "Margin", "ZAR": r["blended_margin_zar"], "BPS": inputs["margin_bps"]},
+        {"Item": "Funding", "ZAR": r["blended_funding_zar"], "BPS": inputs["funding_bps"]},
+        {"Item": "Credit", "ZAR": r["blended_credit_zar"], "BPS": inputs["credit_bps"]},
+        {"Item": "Capital", "ZAR": r["blended_capital_zar"], "BPS": inputs["capital_bps"]},
+        {"Item": "<b>Net Revenue</b>", "ZAR": r["blended_netrev_zar"], "BPS": ""},
+        {"Item": "<b>ROC (approx)</b>", "ZAR": "", "BPS": r["roc_bps"]},
+        {"Item": "", "ZAR": "", "BPS": ""},
+        {"Item": "<b>Facility Amount</b>", "ZAR": inputs["rcf_limit"], "BPS": "100%"},
+        {"Item": "<b>Drawn</b>", "ZAR": r["drawn_amount"], "BPS": f"{drawn_percentage*100:.0f}%"},
+        {"Item": "<b>Undrawn</b>", "ZAR": r["undrawn_amount"], "BPS": f"{(1-drawn_percentage)*100:.0f}%"},
+    ]
+
+
+def build_cln_rows(inputs, r):
+    """Rows of the "CLN Scenario" table for one facility."""
+    drawn_percentage = inputs["drawn_percentage"]
+    return [
+        {"Item": f"<b>CLN Scenario</b>", "ZAR": "", "BPS": ""},
+        {"Item": "CLN Amount", "ZAR": r["cln_amount"], "BPS": f"{r['cln_percentage']*100:.0f}%"},
+        {"Item": "<b>Margin</b>", "ZAR": r["cln_margin_zar"], "BPS": inputs["margin_bps"]},
+        {"Item": "<b>Total Cost</b>", "ZAR": r["cln_total_cost_zar"], "BPS": ""},
+        {"Item": "Funding", "ZAR": r["cln_funding_zar"], "BPS": inputs["funding_bps"]},
+        {"Item": "Credit", "ZAR": r["cln_credit_zar"], "BPS": r["cln_credit_bps"]},
+        {"Item": "Capital", "ZAR": r["cln_capital_zar"], "BPS": r["cln_capital_bps"]},
+        {"Item": "<b>Net Spread</b>", "ZAR": r["cln_net_spread_zar"], "BPS": r["cln_net_spread_bps"]},
+        {"Item": "", "ZAR": "", "BPS": ""},
+        {"Item": "CLN Cost", "ZAR": r["cln_cost_zar"], "BPS": inputs["cln_cost_bps"]},
+        {"Item": "", "ZAR": "", "BPS": ""},
+        {"Item": "<b>Commitment Fee</b>", "ZAR": r["cln_commitment_fee_zar"], "BPS": inputs["commitment_fee_bps"]},
+        {"Item": "Funding", "ZAR": r["cln_commit_funding_zar"], "BPS": inputs["commitment_fee_funding_bps"]},
+        {"Item": "Credit", "ZAR": r["cln_commit_credit_zar"], "BPS": r["cln_commit_credit_bps"]},
+        {"Item": "Capital", "ZAR": r["cln_commit_capital_zar"], "BPS": r["cln_commit_capital_bps"]},
+        {"Item": "<b>Net Spread</b>", "ZAR": r["cln_commit_net_zar"], "BPS": r["cln_commit_net_bps"]},
+        {"Item": "", "ZAR": "", "BPS": ""},
+        {"Item": "<b>Blended View</b>", "ZAR": "", "BPS": ""},
+        {"Item": "Margin", "ZAR": r["cln_blended_margin_zar"], "BPS": ""},
+        {"Item": "Funding", "ZAR": r["cln_blended_funding_zar"], "BPS": ""},
+        {"Item": "Credit", "ZAR": r["cln_blended_credit_zar"], "BPS": ""},
+        {"Item": "Capital", "ZAR": r["cln_blended_capital_zar"], "BPS": ""},
+        {"Item": "CLN Cost", "ZAR": r["cln_cost_zar"], "BPS": inputs["cln_cost_bps"]},
+        {"Item": "<b>Net Revenue</b>", "ZAR": r["cln_blended_netrev_zar"], "BPS": ""},
+        {"Item": "<b>ROC (approx)</b>", "ZAR": "", "BPS": r["cln_roc_bps"]},
+        {"Item": "", "ZAR": "", "BPS": ""},
+        {"Item": "<b>Facility Amount</b>", "ZAR": inputs["rcf_limit"], "BPS": "100%"},
+        {"Item": "<b>Drawn</b>", "ZAR": r["drawn_amount"], "BPS": f"{drawn_percentage*100:.0f}%"},
+        {"Item": "<b>Undrawn</b>", "ZAR": r["undrawn_amount"], "BPS": f"{(1-drawn_percentage)*100:.0f}%"},
+    ]
@@ -0,0 +1,154 @@
+# workflows/rcf_compare.py
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.helpers import display_table
+from workflows.rcf_pricer import FACILITY_DEFAULTS, FACILITY_FIELDS, RCFPricer
+
+# Comparison lines, in display order: (key, label, No CLN items, CLN items).
+# Items are (ZAR, BPS) and name a price() result or facility input; a number
+# is used as-is and None means the line has no value in that column.
+COMPARISON_LINES = (
+    ("margin", "Margin", ("margin_zar", "margin_bps"), ("cln_margin_zar", "margin_bps")),
+    ("funding", "Funding", ("funding_zar", "funding_bps"), ("cln_funding_zar", "funding_bps")),
+    ("credit", "Credit", ("credit_zar", "credit_bps"), ("cln_credit_zar", "cln_credit_bps")),
+    ("capital", "Capital", ("capital_zar", "capital_bps"), ("cln_capital_zar", "cln_capital_bps")),
+    ("net_spread", "<b>Net Spread</b>", ("net_spread_zar", "net_spread_bps"), ("cln_net_spread_zar", "cln_net_spread_bps")),
+    ("cln_cost", "CLN Cost", (0.0, 0.0), ("cln_cost_zar", "cln_cost_bps")),
+    ("commitment_fee", "<b>Commitment Fee</b>", ("commitment_fee_zar", "commitment_fee_bps"),
+     ("cln_commitment_fee_zar", "commitment_fee_bps")),
+    ("commit_funding", "Commitment Funding", ("comm_fee_funding_zar", "commitment_fee_funding_bps"),
+     ("cln_commit_funding_zar", "commitment_fee_funding_bps")),
+    ("commit_credit", "Commitment Credit", ("comm_fee_credit_zar", "commitment_fee_credit_bps"),
+     ("cln_commit_credit_zar", "cln_commit_credit_bps")),
+    ("commit_capital", "Commitment Capital", ("comm_fee_capital_zar", "commitment_fee_capital_bps"),
+     ("cln_commit_capital_zar", "cln_commit_capital_bps")),
+    ("commit_net", "<b>Commitment Net Spread</b>", ("net_commit_fee_zar", "net_commit_fee_bps"),
+     ("cln_commit_net_zar", "cln_commit_net_bps")),
+    ("blended_margin", "Blended Margin", ("blended_margin_zar", None), ("cln_blended_margin_zar", None)),
+    ("blended_funding", "Blended Funding", ("blended_funding_zar", None), ("cln_blended_funding_zar", None)),
+    ("blended_credit", "Blended Credit", ("blended_credit_zar", None), ("cln_blended_credit_zar", None)),
+    ("blended_capital", "Blended Capital", ("blended_capital_zar", None), ("cln_blended_capital_zar", None)),
+    ("net_revenue", "<b>Net Revenue</b>", ("blended_netrev_zar", None), ("cln_blended_netrev_zar", None)),
+    ("roc", "<b>ROC (approx)</b>", (None, "roc_bps"), (None, "cln_roc_bps")),
+    ("cln_amount", "CLN Amount", (0.0, None), ("cln_amount", None)),
+    ("facility", "<b>Facility Amount</b>", ("rcf_limit", None), ("rcf_limit", None)),
+    ("drawn", "<b>Drawn</b>", ("drawn_amount", None), ("drawn_amount", None)),
+    ("undrawn", "<b>Undrawn</b>", ("undrawn_amount", None), ("undrawn_amount", None)),
+)
+
+# Inputs that can be varied per structuring alternative in the UI.
+ALTERNATIVE_FIELDS = ("drawn_percentage", "margin_bps", "cln_amount", "cln_cost_bps")
+
+
+def _line_matrix(values, n, column, structure):
+    """(lines x scenarios) values of one column for one structure (2 = No CLN, 3 = CLN)."""
+    rows = []
+    for line in COMPARISON_LINES:
+        item = line[structure][column]
+        if item is None:
+            rows.append(np.full(n, np.nan))
+        elif isinstance(item, str):
+            rows.append(values[item])
+        else:
+            rows.append(np.full(n, float(item)))
+    return np.vstack(rows)
+
+
+def compare_scenarios(scenarios, pricer=None):
+    """
+    Prices any number of scenarios in one vectorized call and lines their
+    items up by COMPARISON_LINES key. `scenarios` is a list of
+    (name, inputs, with_cln) tuples; the first one is the baseline.
+
+    Returns a DataFrame indexed by line label with (scenario, column)
+    columns: "ZAR" and "BPS" for every scenario, plus "Δ ZAR", "Δ BPS" and
+    "Δ %" (ZAR change relative to the baseline) for every other scenario.
+    """
+    names = [name for name, _, _ in scenarios]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Scenario names must be unique: {names}")
+
+    pricer = pricer or RCFPricer()
+    stacked = {
+        field: np.array([{**FACILITY_DEFAULTS, **inputs}[field] for _, inputs, _ in scenarios], dtype=np.float64)
+        for field in FACILITY_FIELDS
+    }
+    values = {**stacked, **pricer.price(**stacked)}
+    with_cln = np.array([cln for _, _, cln in scenarios], dtype=bool)
+
+    n = len(scenarios)
+    zar, bps = (
+        np.where(with_cln, _line_matrix(values, n, column, 3), _line_matrix(values, n, column, 2))
+        for column in (0, 1)
+    )
+    delta_zar = zar - zar[:, :1]
+    delta_bps = bps - bps[:, :1]
+    base = np.abs(zar[:, :1])
+    delta_pct = np.divide(delta_zar * 100, base, out=np.full_like(delta_zar, np.nan),
+                          where=(base != 0) & ~np.isnan(base))
+
+    columns = {}
+    for j, name in enumerate(names):
+        columns[(name, "ZAR")] = zar[:, j]
+        columns[(name, "BPS")] = bps[:, j]
+        if j:
+            columns[(name, "Δ ZAR")] = delta_zar[:, j]
+            columns[(name, "Δ BPS")] = delta_bps[:, j]
+            columns[(name, "Δ %")] = delta_pct[:, j]
+    table = pd.DataFrame(columns, index=pd.Index([line[1] for line in COMPARISON_LINES], name="Item"))
+    table.columns = pd.MultiIndex.from_tuples(table.columns)
+    return table
+
+
+def _format_comparison(table):
+    """Flattens a compare_scenarios table into display rows for display_table."""
+    display = pd.DataFrame({"Item": table.index})
+    for (name, column), series in table.items():
+        values = series.to_numpy()
+        if column == "Δ %":
+            formatted = [f"{v:,.1f}%" if not np.isnan(v) else "" for v in values]
+        else:
+            formatted = [float(v) if not np.isnan(v) else "" for v in values]
+        display[f"{name} {column}"] = formatted
+    return display
+
+
+def display_rcf_comparison(company_name, inputs):
+    """
+    Single comparison table for the RCF – CLN Calculator: the facility
+    without and with its CLN side by side, plus any structuring alternatives
+    entered by the user, each with its change against the No CLN baseline.
+    """
+    st.subheader("Single Comparison Table (No CLN vs. CLN)")
+    st.write("Add structuring alternatives below; blank cells use the sidebar values.")
+    alternatives = st.data_editor(
+        pd.DataFrame({"Scenario": pd.Series(dtype=str),
+                      **{field: pd.Series(dtype=float) for field in ALTERNATIVE_FIELDS}}),
+        num_rows="dynamic",
+        key="rcf_compare_alternatives",
+    )
+
+    scenarios = [("No CLN", inputs, False), ("CLN", inputs, True)]
+    for i, row in enumerate(alternatives.to_dict("records"), start=1):
+        overrides = {field: float(row[field]) for field in ALTERNATIVE_FIELDS if pd.notna(row.get(field))}
+        name = row.get("Scenario") if isinstance(row.get("Scenario"), str) and row["Scenario"].strip() else f"Alt {i}"
+        scenarios.append((name, {**inputs, **overrides}, True))
+
+    try:
+        table = compare_scenarios(scenarios)
+    except ValueError as e:
+        st.error(f"Could not compare scenarios: {e}")
+        return
+
+    flat = table.copy()
+    flat.columns = [f"{name} {column}" for name, column in table.columns]
+    st.download_button(
+        label="Download Comparison CSV",
+        data=flat.to_csv().encode('utf-8'),
+        file_name=f"{company_name}_comparison.csv",
+        mime='text/csv'
+    )
+    display_table(_format_comparison(table), key="rcf_comparison", file_name=f"{company_name}_comparison")
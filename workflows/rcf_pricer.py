@@ -0,0 +1,220 @@
+# workflows/rcf_pricer.py
+
+import numpy as np
+
+# Inputs describing one facility, in the order the RCF calculator asks for them.
+FACILITY_FIELDS = (
+    "rcf_limit",
+    "drawn_percentage",
+    "cap_cost",
+    "margin_bps",
+    "funding_bps",
+    "credit_bps",
+    "capital_bps",
+    "commitment_fee_bps",
+    "commitment_fee_funding_bps",
+    "commitment_fee_credit_bps",
+    "commitment_fee_capital_bps",
+    "cln_amount",
+    "cln_cost_bps",
+)
+
+# Defaults for optional inputs (a facility without a CLN).
+FACILITY_DEFAULTS = {"cln_amount": 0.0, "cln_cost_bps": 0.0}
+
+
+def _ratio(numerator, denominator):
+    """numerator / denominator, with 0 wherever the denominator is 0."""
+    out = np.zeros(np.broadcast(numerator, denominator).shape)
+    return np.divide(numerator, denominator, out=out, where=denominator != 0)
+
+
+class RCFPricer:
+    """
+    Vectorized RCF – CLN pricing engine with no Streamlit dependency.
+
+    Every input to price() may be a scalar or an array; inputs are broadcast
+    together, so a single call prices any number of facilities. Results are
+    returned as a dict of float64 arrays, one entry per line item in the
+    calculator's No CLN and CLN tables.
+    """
+
+    def price(self, **inputs):
+        """
+        Prices facilities described by FACILITY_FIELDS keyword arguments
+        (cln_amount / cln_cost_bps are optional) and returns the No CLN and
+        CLN line items together.
+        """
+        unknown = set(inputs) - set(FACILITY_FIELDS)
+        if unknown:
+            raise TypeError(f"Unknown facility inputs: {sorted(unknown)}")
+        missing = set(FACILITY_FIELDS) - set(inputs) - set(FACILITY_DEFAULTS)
+        if missing:
+            raise TypeError(f"Missing facility inputs: {sorted(missing)}")
+
+        values = {**FACILITY_DEFAULTS, **inputs}
+        arrays = np.broadcast_arrays(*(np.asarray(values[f], dtype=np.float64) for f in FACILITY_FIELDS))
+        f = dict(zip(FACILITY_FIELDS, arrays))
+
+        result = self.price_no_cln(f)
+        result.update(self.price_cln(f, result))
+        return result
+
+    def price_no_cln(self, f):
+        """Line items for the facilities without a CLN."""
+        drawn_amount = f["rcf_limit"] * f["drawn_percentage"]
+        undrawn_amount = f["rcf_limit"] - drawn_amount
+
+        # Drawn margin and costs
+        margin_zar = drawn_amount * (f["margin_bps"] / 10000)
+        funding_zar = drawn_amount * (f["funding_bps"] / 10000)
+        credit_zar = drawn_amount * (f["credit_bps"] / 10000)
+        capital_zar = drawn_amount * (f["capital_bps"] / 10000)
+        total_cost_bps = f["funding_bps"] + f["credit_bps"] + f["capital_bps"]
+        total_cost_zar = funding_zar + credit_zar + capital_zar
+
+        # Undrawn
+        commitment_fee_zar = undrawn_amount * (f["commitment_fee_bps"] / 10000)
+        comm_fee_funding_zar = undrawn_amount * (f["commitment_fee_funding_bps"] / 10000)
+        comm_fee_credit_zar = undrawn_amount * (f["commitment_fee_credit_bps"] / 10000)
+        comm_fee_capital_zar = undrawn_amount * (f["commitment_fee_capital_bps"] / 10000)
+        net_commit_fee_bps = (f["commitment_fee_bps"] + f["commitment_fee_funding_bps"] +
+                              f["commitment_fee_credit_bps"] + f["commitment_fee_capital_bps"])
+
+        # Blended
+        blended_margin_zar = margin_zar + commitment_fee_zar
+        blended_funding_zar = funding_zar + comm_fee_funding_zar
+        blended_credit_zar = credit_zar + comm_fee_credit_zar
+        blended_capital_zar = capital_zar + comm_fee_capital_zar
+
+        # Simplistic ROC: drawn spread before capital over drawn capital cost,
+        # zero when the blended capital charge (or capital bps) is zero
+        blended_capital_bps = (f["capital_bps"] * f["drawn_percentage"] +
+                               f["commitment_fee_capital_bps"] * (1 - f["drawn_percentage"]))
+        roc_bps = _ratio(f["margin_bps"] + f["funding_bps"] + f["credit_bps"], -f["capital_bps"]) * f["cap_cost"]
+        roc_bps = np.where(blended_capital_bps == 0, 0.0, roc_bps)
+
+        return {
+            "drawn_amount": drawn_amount,
+            "undrawn_amount": undrawn_amount,
+            "margin_zar": margin_zar,
+            "funding_zar": funding_zar,
+            "credit_zar": credit_zar,
+            "capital_zar": capital_zar,
+            "total_cost_bps": total_cost_bps,
+            "total_cost_zar": total_cost_zar,
+            "net_spread_zar": margin_zar + total_cost_zar,
+            "net_spread_bps": f["margin_bps"] + total_cost_bps,
+            "commitment_fee_zar": commitment_fee_zar,
+            "comm_fee_funding_zar": comm_fee_funding_zar,
+            "comm_fee_credit_zar": comm_fee_credit_zar,
+            "comm_fee_capital_zar": comm_fee_capital_zar,
+            "net_commit_fee_bps": net_commit_fee_bps,
+            "net_commit_fee_zar": undrawn_amount * (net_commit_fee_bps / 10000),
+            "blended_margin_zar": blended_margin_zar,
+            "blended_funding_zar": blended_funding_zar,
+            "blended_credit_zar": blended_credit_zar,
+            "blended_capital_zar": blended_capital_zar,
+            "blended_netrev_zar": blended_margin_zar + blended_funding_zar + blended_credit_zar + blended_capital_zar,
+            "roc_bps": roc_bps,
+        }
+
+    def price_cln(self, f, no_cln):
+        """
+        Line items for the same facilities with a CLN: credit and capital
+        charges scale by (1 - CLN share of the limit) and the CLN cost is added.
+        """
+        drawn_amount = no_cln["drawn_amount"]
+        undrawn_amount = no_cln["undrawn_amount"]
+
+        cln_amount = np.minimum(f["cln_amount"], f["rcf_limit"])
+        cln_percentage = _ratio(cln_amount, f["rcf_limit"])
+        remaining = 1 - cln_percentage
+
+        # Margin and funding stay the same; credit and capital scale down
+        cln_credit_bps = f["credit_bps"] * remaining
+        cln_capital_bps = f["capital_bps"] * remaining
+        cln_margin_zar = no_cln["margin_zar"]
+        cln_funding_zar = no_cln["funding_zar"]
+        cln_credit_zar = drawn_amount * (cln_credit_bps / 10000)
+        cln_capital_zar = drawn_amount * (cln_capital_bps / 10000)
+        cln_total_cost_zar = cln_funding_zar + cln_credit_zar + cln_capital_zar
+
+        # CLN cost
+        cln_cost_zar = cln_amount * (f["cln_cost_bps"] / 10000)
+
+        # Commitment fees
+        cln_commit_credit_bps = f["commitment_fee_credit_bps"] * remaining
+        cln_commit_capital_bps = f["commitment_fee_capital_bps"] * remaining
+        cln_commitment_fee_zar = no_cln["commitment_fee_zar"]
+        cln_commit_funding_zar = no_cln["comm_fee_funding_zar"]
+        cln_commit_credit_zar = undrawn_amount * (cln_commit_credit_bps / 10000)
+        cln_commit_capital_zar = undrawn_amount * (cln_commit_capital_bps / 10000)
+        cln_commit_net_bps = (f["commitment_fee_bps"] + f["commitment_fee_funding_bps"] +
+                              cln_commit_credit_bps + cln_commit_capital_bps)
+
+        # Blended (CLN cost is negative)
+        cln_blended_margin_zar = cln_margin_zar + cln_commitment_fee_zar
+        cln_blended_funding_zar = cln_funding_zar + cln_commit_funding_zar
+        cln_blended_credit_zar = cln_credit_zar + cln_commit_credit_zar
+        cln_blended_capital_zar = cln_capital_zar + cln_commit_capital_zar
+        cln_blended_netrev_zar = (cln_blended_margin_zar + cln_blended_funding_zar +
+                                  cln_blended_credit_zar + cln_blended_capital_zar + cln_cost_zar)
+
+        # Approx ROC
+        cln_roc_bps = _ratio(cln_blended_margin_zar + cln_blended_funding_zar + cln_blended_credit_zar,
+                             np.abs(cln_blended_capital_zar)) * f["cap_cost"]
+
+        return {
+            "cln_amount": cln_amount,
+            "cln_percentage": cln_percentage,
+            "cln_margin_zar": cln_margin_zar,
+            "cln_funding_zar": cln_funding_zar,
+            "cln_credit_bps": cln_credit_bps,
+            "cln_credit_zar": cln_credit_zar,
+            "cln_capital_bps": cln_capital_bps,
+            "cln_capital_zar": cln_capital_zar,
+            "cln_total_cost_zar": cln_total_cost_zar,
+            "cln_net_spread_zar": cln_margin_zar + cln_total_cost_zar,
+            "cln_net_spread_bps": f["margin_bps"] + f["funding_bps"] + cln_credit_bps + cln_capital_bps,
+            "cln_cost_zar": cln_cost_zar,
+            "cln_commitment_fee_zar": cln_commitment_fee_zar,
+            "cln_commit_funding_zar": cln_commit_funding_zar,
+            "cln_commit_credit_bps": cln_commit_credit_bps,
+            "cln_commit_credit_zar": cln_commit_credit_zar,
+            "cln_commit_capital_bps": cln_commit_capital_bps,
+            "cln_commit_capital_zar": cln_commit_capital_zar,
+            "cln_commit_net_bps": cln_commit_net_bps,
+            "cln_commit_net_zar": undrawn_amount * (cln_commit_net_bps / 10000),
+            "cln_blended_margin_zar": cln_blended_margin_zar,
+            "cln_blended_funding_zar": cln_blended_funding_zar,
+            "cln_blended_credit_zar": cln_blended_credit_zar,
+            "cln_blended_capital_zar": cln_blended_capital_zar,
+            "cln_blended_netrev_zar": cln_blended_netrev_zar,
+            "cln_roc_bps": cln_roc_bps,
+        }
+
+
+def facility_line_items(result, i=0):
+    """Returns the i-th facility's line items from a price() result as floats."""
+    return {name: float(np.ravel(values)[i]) for name, values in result.items()}
+
+
+def sensitivity_grid(inputs, drawn_percentages, cln_amounts, margins_bps=None, pricer=None):
+    """
+    Prices one facility over a grid of drawn % x CLN amount (and optionally
+    margin bps) in a single broadcast call. Returns the price() result, with
+    every line item shaped (len(drawn_percentages), len(cln_amounts)), or
+    (len(margins_bps), len(drawn_percentages), len(cln_amounts)) when a
+    margin sweep is given.
+    """
+    pricer = pricer or RCFPricer()
+    grid = dict(inputs)
+    if margins_bps is None:
+        grid["drawn_percentage"] = np.asarray(drawn_percentages, dtype=np.float64)[:, None]
+        grid["cln_amount"] = np.asarray(cln_amounts, dtype=np.float64)[None, :]
+    else:
+        grid["margin_bps"] = np.asarray(margins_bps, dtype=np.float64)[:, None, None]
+        grid["drawn_percentage"] = np.asarray(drawn_percentages, dtype=np.float64)[None, :, None]
+        grid["cln_amount"] = np.asarray(cln_amounts, dtype=np.float64)[None, None, :]
+    return pricer.price(**grid)